@@ -6,12 +6,14 @@ import re
 from argparse import Namespace
 from logging import getLogger
 from pprint import pformat
+from threading import Condition, Thread
+from time import monotonic
 from typing import TYPE_CHECKING, Any
 
 from .approver import Approver
 from .config import settings
 from .loader.amqp_listener import AMQPListener
-from .loader.qem import get_submission_settings_data
+from .loader.qem import get_single_submission, get_submission_settings_data
 from .syncres import SyncRes
 from .types.types import Data
 from .utils import compare_submission_data
@@ -25,6 +27,79 @@ build_sub_regex = re.compile(r":(?:(?P<type>[^:]+):)?(?P<id>\d+)(?::.*)?")
 build_agg_regex = re.compile(r"\d{8}-\d+")
 
 
+class ApprovalWorker:
+    """Long-lived approver evaluating submissions once their bursts of finished jobs settled.
+
+    Every finished job of a submission postpones its evaluation by the debounce delay, up to
+    the maximum delay after its first finished job, so many jobs finishing within minutes
+    result in a single approval attempt. The approver and its clients are kept between
+    evaluations.
+    """
+
+    def __init__(self, approver: Approver, debounce: float, max_delay: float) -> None:
+        """Initialize the ApprovalWorker class."""
+        self.approver = approver
+        self.debounce = debounce
+        self.max_delay = max_delay
+        # first scheduled and due time of the pending evaluation by submission number and type
+        self._pending: dict[tuple[int, str], tuple[float, float]] = {}
+        self._closed = False
+        self._cond = Condition()
+        self._thread = Thread(target=self.run, name="approval-worker", daemon=True)
+
+    def start(self) -> None:
+        """Start evaluating scheduled submissions in the background."""
+        self._thread.start()
+
+    def schedule(self, sub_nr: int, sub_type: str) -> None:
+        """Schedule the evaluation of a submission, postponing an already pending one."""
+        now = monotonic()
+        with self._cond:
+            first, _ = self._pending.get((sub_nr, sub_type), (now, now))
+            self._pending[sub_nr, sub_type] = (first, min(now + self.debounce, first + self.max_delay))
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """Stop the worker after the current evaluation, dropping all pending ones."""
+        with self._cond:
+            self._closed = True
+            if self._pending:
+                log.info("Dropping %d pending approval evaluations", len(self._pending))
+                self._pending.clear()
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.approver.close()
+
+    def take(self) -> tuple[int, str] | None:
+        """Return the next submission which is due or None once closed."""
+        with self._cond:
+            while not self._closed:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                sub, (_, due) = min(self._pending.items(), key=lambda item: item[1][1])
+                if due <= monotonic():
+                    del self._pending[sub]
+                    return sub
+                self._cond.wait(due - monotonic())
+            return None
+
+    def run(self) -> None:
+        """Evaluate submissions as they become due until the worker is closed."""
+        while (sub := self.take()) is not None:
+            self.approve(*sub)
+
+    def approve(self, sub_nr: int, sub_type: str) -> None:
+        """Evaluate a single submission for approval against its current results."""
+        log.info("Submission %s:%s: Evaluating for approval", sub_type, sub_nr)
+        self.approver.refresh()
+        try:
+            self.approver.approve_submissions(get_single_submission(sub_nr, submission_type=sub_type))
+        except Exception:
+            log.exception("Approval of submission %s:%s failed", sub_type, sub_nr)
+
+
 class AMQP(SyncRes):
     """AMQP listener and message handler."""
 
@@ -33,10 +108,17 @@ class AMQP(SyncRes):
         super().__init__(args)
         self.args = args
         self.amqp_listener = AMQPListener(url=args.url, routing_keys=["suse.openqa.#"], handler=self.on_message)
+        # evaluations are triggered by changed results; the approval state file is kept by sub-approve
+        approver = Approver(args, use_state_file=False)
+        self.approval_worker = ApprovalWorker(approver, settings.approval_debounce, settings.approval_max_delay)
 
     def __call__(self) -> int:
         """Start the AMQP listener."""
-        self.amqp_listener.listen()
+        self.approval_worker.start()
+        try:
+            self.amqp_listener.listen()
+        finally:
+            self.approval_worker.close()
         return 0
 
     def on_message(self, message: dict[str, Any], routing_key: str) -> None:
@@ -63,7 +145,7 @@ class AMQP(SyncRes):
                 self.post_result(r)
 
     def handle_submission(self, sub_nr: int, sub_type: str, message: dict[str, Any]) -> None:
-        """Handle results for a specific submission and trigger approval."""
+        """Handle results for a specific submission and schedule its approval."""
         # Load Data about current submission from dashboard database
         try:
             settings: Sequence[Data] = get_submission_settings_data(sub_nr, submission_type=sub_type)
@@ -76,6 +158,5 @@ class AMQP(SyncRes):
                 continue
             self.fetch_openqa_results(sub, message)
 
-        # Try to approve submission
-        approve = Approver(self.args, single_submission=sub_nr, submission_type=sub_type)
-        approve()
+        # Try to approve submission once no further jobs finished for a while
+        self.approval_worker.schedule(sub_nr, sub_type)
@@ -4,21 +4,22 @@
 
 from __future__ import annotations
 
-import operator
 import re
 import string
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import UTC, datetime, timedelta
 from enum import Enum, auto
 from functools import lru_cache
 from http import HTTPStatus
 from logging import getLogger
-from typing import TYPE_CHECKING
+from threading import Lock
+from typing import TYPE_CHECKING, Any
 from urllib.error import HTTPError
 
 import osc.conf
 import osc.core
-from openqa_client.exceptions import RequestError
+import requests
+from openqa_client.exceptions import OpenQAClientError, RequestError
 
 import openqabot.config as config_module
 from openqabot import config, dashboard
@@ -26,6 +27,7 @@ from openqabot.errors import JobNotFoundError, NoResultsError
 from openqabot.openqa import OpenQAInterface
 
 from .commenter import Commenter
+from .fingerprints import FingerprintStore, fingerprint
 from .loader.gitea import approve_pr, make_token_header
 from .loader.qem import (
     JobAggr,
@@ -39,6 +41,7 @@ from .loader.qem import (
 
 if TYPE_CHECKING:
     from argparse import Namespace
+    from collections.abc import Iterable
 
 
 class JobResult(Enum):
@@ -59,8 +62,14 @@ class OlderJobResult(Enum):
 
 log = getLogger("bot.approver")
 
-ACCEPTABLE_FOR_TEMPLATE = r"@review:acceptable_for:(?:incident|submission)_{sub}:(.+?)(?:$|\s)"
-MAINTENANCE_INCIDENT_IDENTIFIER = "Maintenance:/"
+# a marker needs a non-empty reason; the lookahead keeps markers following each other findable
+ACCEPTABLE_FOR_PATTERN = re.compile(r"@review:acceptable_for:(?:incident|submission)_(\d+):(?=.)", re.DOTALL)
+NON_PRINTABLE_PATTERN = re.compile(f"[^{re.escape(string.printable)}]")
+MAINTENANCE_INCIDENT_PATTERN = re.compile(r"Maintenance:/(\d+)/")
+# We need a considerable amount of older jobs, since there could be many failed manual restarts from same day
+OLDER_JOBS_LIMIT = 20
+# prefix of the approval state entries keeping whether a not-ok aggregate job was ok before
+OLDER_JOB_RESULT_PREFIX = "older:"
 
 
 def ms2str(sub: SubReq) -> str:
@@ -68,8 +77,18 @@ def ms2str(sub: SubReq) -> str:
     return f"{config.settings.obs_maint_prj}:{sub.sub}:{sub.req}" if sub.type is None else f"{sub.type}:{sub.sub}"
 
 
-def deduplicate_jobs_by_scenario(job_results: list[dict]) -> list[dict]:
-    """Keep only the most recent job (highest job_id) per scenario name.
+def summarize_results(results: Iterable[JobResult]) -> JobResult:
+    """Summarize the results of all job settings of a submission, stopping at the first failure."""
+    has_passed = False
+    for result in results:
+        if result is JobResult.FAILED:
+            return JobResult.FAILED
+        has_passed |= result is JobResult.PASSED
+    return JobResult.PASSED if has_passed else JobResult.NO_JOBS
+
+
+def reduce_job_results(job_results: list[dict]) -> tuple[int, list[dict]]:
+    """Keep only the most recent job (highest job_id) per scenario name and return the not passed ones.
 
     When a job is cloned in openQA, both the original (failed) and clone (passed)
     may exist in the dashboard. We only care about the most recent job for each
@@ -77,19 +96,24 @@ def deduplicate_jobs_by_scenario(job_results: list[dict]) -> list[dict]:
 
     Jobs without a 'name' field are not deduplicated since we cannot determine
     if they belong to different scenarios.
-    """
-    named_jobs = [j for j in job_results if j.get("name")]
-    unnamed_jobs = [j for j in job_results if j.get("name") is None]
-
-    if not named_jobs:
-        return unnamed_jobs
 
-    unique_names = {j["name"] for j in named_jobs if "job_id" in j}
-    latest = [
-        max((j for j in named_jobs if j["name"] == name), key=operator.itemgetter("job_id")) for name in unique_names
-    ]
+    Returns:
+        The number of jobs left after deduplication and the not passed ones of them.
 
-    return latest + unnamed_jobs
+    """
+    latest: dict[str, dict] = {}
+    unnamed_not_ok = []
+    unnamed = 0
+    for job in job_results:
+        name = job.get("name")
+        if name is None:
+            unnamed += 1
+            if job["status"] != "passed":
+                unnamed_not_ok.append(job)
+        elif name and "job_id" in job and (name not in latest or job["job_id"] > latest[name]["job_id"]):
+            latest[name] = job
+    not_ok = [job for job in latest.values() if job["status"] != "passed"]
+    return len(latest) + unnamed, not_ok + unnamed_not_ok
 
 
 def handle_http_error(e: HTTPError, sub: SubReq) -> bool:
@@ -111,7 +135,7 @@ def handle_http_error(e: HTTPError, sub: SubReq) -> bool:
 
 def sanitize_comment_text(text: str) -> str:
     """Remove non-printable characters and newlines from comment text."""
-    text = "".join(x for x in text if x in string.printable)
+    text = NON_PRINTABLE_PATTERN.sub("", text)
     text = text.replace("\r", " ").replace("\n", " ")
     return text.strip()
 
@@ -119,32 +143,44 @@ def sanitize_comment_text(text: str) -> str:
 class Approver:
     """Approval logic for submissions."""
 
-    def __init__(
-        self,
-        args: Namespace,
-        single_submission: int | None = None,
-        submission_type: str | None = None,
-    ) -> None:
-        """Initialize the Approver class."""
+    def __init__(self, args: Namespace, *, use_state_file: bool = True) -> None:
+        """Initialize the Approver class.
+
+        Without use_state_file the approval state file is neither read nor written.
+        """
         self.dry = args.dry
         self.gitea_token: dict[str, str] = make_token_header(args.gitea_token)
-        if single_submission is None:
-            raw = getattr(args, "submission", None) or getattr(args, "incident", None)
-            if isinstance(raw, str) and ":" in raw:
-                s_type, s_id = raw.split(":", 1)
-                self.single_submission = int(s_id)
-                self.submission_type = s_type
-            else:
-                self.single_submission = int(raw) if raw is not None else None
-                self.submission_type = None
-            self.all_submissions = args.all_submissions
+        raw = getattr(args, "submission", None) or getattr(args, "incident", None)
+        if isinstance(raw, str) and ":" in raw:
+            s_type, s_id = raw.split(":", 1)
+            self.single_submission = int(s_id)
+            self.submission_type = s_type
         else:
-            self.single_submission = single_submission
-            self.all_submissions = False
-            self.submission_type = submission_type
+            self.single_submission = int(raw) if raw is not None else None
+            self.submission_type = None
+        self.all_submissions = getattr(args, "all_submissions", False)
         self.comment = getattr(args, "comment", False)
+        self.fingerprints = self.load_fingerprints() if use_state_file else None
         self.client = OpenQAInterface()
         self.commenter = Commenter(args, submissions=[])
+        # histories of not-ok aggregate jobs and the openQA jobs fetched in bulk which could override them
+        self.older_histories: dict[int, dict[str, Any]] = {}
+        self.older_jobs: dict[int, dict[str, Any]] = {}
+        self.older_jobs_lock = Lock()
+        # job settings are only evaluated concurrently if a single submission is evaluated,
+        # otherwise the submissions are
+        self.concurrent_settings = False
+        # shared by all prefetches to bound the number of concurrent lookups, stopped by close()
+        self.lookups = ThreadPoolExecutor(max_workers=config.settings.max_workers, thread_name_prefix="approver-lookup")
+
+    def load_fingerprints(self) -> FingerprintStore | None:
+        """Load the fingerprints of submissions found not ready by previous runs if configured."""
+        settings = config.settings
+        if settings.approve_state_file is None or self.single_submission:
+            return None
+        store = FingerprintStore(settings.approve_state_file, settings.state_max_age)
+        store.load()
+        return store
 
     def __call__(self) -> int:
         """Run the approval process."""
@@ -154,7 +190,19 @@ class Approver:
             if self.single_submission
             else get_submissions_approver()
         )
-
+        try:
+            return self.approve_submissions(subreqs)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the threads looking up the data of not-ok jobs."""
+        self.lookups.shutdown(cancel_futures=True)
+
+    def approve_submissions(self, subreqs: list[SubReq]) -> int:
+        """Approve all given submissions which are ready for approval."""
+        self.prefetch_job_results(subreqs)
+        self.concurrent_settings = len(subreqs) == 1
         overall_result = True
         with ThreadPoolExecutor(max_workers=config.settings.max_workers) as executor:
             approvable_flags = list(executor.map(self.approvable, subreqs))
@@ -174,10 +222,155 @@ class Approver:
                 for result in executor.map(self.approve, submissions_to_approve):
                     overall_result &= result
 
+        if self.fingerprints is not None and not self.dry:
+            self.fingerprints.save()
         log.info("Submission approval process finished")
 
         return 0 if overall_result else 1
 
+    def refresh(self) -> None:
+        """Forget all cached job results so a long-lived approver sees the current state.
+
+        The openQA and OBS clients are kept as well as the settings of finished jobs in the
+        bounded job_submissions cache.
+        """
+        with self.older_jobs_lock:
+            self.older_histories.clear()
+            self.older_jobs.clear()
+        dashboard.clear_cache()
+        OpenQAInterface.get_job_comments.cache_clear()
+        OpenQAInterface.get_older_jobs.cache_clear()
+        Approver.acceptable_for.cache_clear()
+        Approver.validate_job_qam.cache_clear()
+        Approver.was_ok_before.cache_clear()
+        Approver.get_jobs.cache_clear()
+        Approver.get_setting_jobs.cache_clear()
+
+    def job_settings(self, sub: SubReq) -> tuple[list[JobAggr], list[JobAggr]]:
+        """Return the submission and the aggregate job settings of a submission evaluated for approval.
+
+        Aggregate job settings are only returned if the submission requires them; missing
+        settings are left to the evaluation to report.
+        """
+        try:
+            s_jobs = get_submission_settings(sub.sub, all_submissions=self.all_submissions, submission_type=sub.type)
+        except NoResultsError:
+            return [], []
+        if not any(s.with_aggregate for s in s_jobs):
+            return s_jobs, []
+        try:
+            return s_jobs, get_aggregate_settings(sub.sub, submission_type=sub.type)
+        except NoResultsError:
+            return s_jobs, []
+
+    def prefetch_job_settings(self, sub: SubReq) -> tuple[list[JobAggr], list[JobAggr]]:
+        """Fetch the job settings of a submission ahead of the evaluation, ignoring failures."""
+        try:
+            return self.job_settings(sub)
+        except requests.RequestException as e:
+            log.debug("Prefetching job settings of %s failed: %s", ms2str(sub), e)
+            return [], []
+
+    @staticmethod
+    def prefetch_job_result(api: str, settings_id: int, submission_type: str | None) -> None:
+        """Fetch the job results of a job setting ahead of the evaluation, ignoring failures."""
+        try:
+            Approver.fetch_job_results(api, settings_id, submission_type)
+        except requests.RequestException as e:
+            log.debug("Prefetching job results of setting %s failed: %s", settings_id, e)
+
+    def prefetch_job_results(self, subreqs: list[SubReq]) -> None:
+        """Fetch the job results of all job settings of all submissions in parallel.
+
+        The dashboard GET cache keeps the results by job setting, so submissions sharing
+        aggregate job settings are evaluated without any further request for them.
+        """
+        with ThreadPoolExecutor(max_workers=config.settings.max_workers) as executor:
+            settings = list(executor.map(self.prefetch_job_settings, subreqs))
+            routes = {
+                (api, job_aggr.id, sub.type)
+                for sub, (s_jobs, a_jobs) in zip(subreqs, settings, strict=True)
+                for api, jobs in (("api/jobs/incident/", s_jobs), ("api/jobs/update/", a_jobs))
+                for job_aggr in jobs
+            }
+            log.debug("Prefetching job results of %d job settings", len(routes))
+            list(executor.map(lambda route: self.prefetch_job_result(*route), routes))
+
+    def older_job_history(self, job_id: int) -> dict[str, Any]:
+        """Return the older jobs of a not-ok job, fetching them once per run."""
+        with self.older_jobs_lock:
+            history = self.older_histories.get(job_id)
+        if history is None:
+            history = self.client.get_older_jobs(job_id, OLDER_JOBS_LIMIT)
+            with self.older_jobs_lock:
+                self.older_histories[job_id] = history
+        return history
+
+    def prefetch_older_job_history(self, job_id: int) -> dict:
+        """Fetch the older jobs of a not-ok job ahead of its evaluation, ignoring failures."""
+        try:
+            return self.older_job_history(job_id)
+        except OpenQAClientError as e:
+            log.debug("Prefetching older jobs of job %s failed: %s", job_id, e)
+            return {"data": []}
+
+    def prefetch_older_jobs(self, not_ok_job_ids: list[int], sub: int) -> None:
+        """Fetch the data needed to override not-ok aggregate jobs by older passing jobs in bulk.
+
+        The histories of all not-ok jobs are fetched in parallel and all their older passing
+        candidates in batches, so the jobs are evaluated against shared data. The histories
+        are kept for the run, so a lot of not-ok jobs cannot evict them from the client cache
+        before they are evaluated.
+        """
+        if not not_ok_job_ids:
+            return
+        histories = list(self.lookups.map(self.prefetch_older_job_history, not_ok_job_ids))
+        with self.older_jobs_lock:
+            candidates = {
+                job["id"]
+                for history in histories
+                for job in history.get("data", [])[1:]
+                if job.get("result") in {"passed", "softfailed"} and job["id"] not in self.older_jobs
+            }
+        if candidates:
+            log.debug("Fetching %d older jobs of %d not-ok aggregate jobs", len(candidates), len(not_ok_job_ids))
+            try:
+                jobs = {job["id"]: job for job in self.client.get_jobs_by_ids(list(candidates))}
+            except OpenQAClientError as e:
+                log.debug("Fetching older jobs failed: %s", e)
+                return
+            with self.older_jobs_lock:
+                self.older_jobs.update(jobs)
+        self.prefetch_job_validations(histories, sub)
+
+    def prefetch_job_validation(self, job_id: int) -> None:
+        """Validate a job in the dashboard ahead of its evaluation, ignoring failures."""
+        try:
+            self.validate_job_qam(job_id)
+        except requests.RequestException as e:
+            log.debug("Prefetching dashboard validation of job %s failed: %s", job_id, e)
+
+    def prefetch_job_validations(self, histories: list[dict], sub: int) -> None:
+        """Validate the older jobs which could override not-ok aggregate jobs concurrently.
+
+        Only the first older passing job of every history is ever used, and only if it
+        contains the submission.
+        """
+        first_passing = (
+            next(
+                (job["id"] for job in history.get("data", [])[1:] if job.get("result") in {"passed", "softfailed"}),
+                None,
+            )
+            for history in histories
+        )
+        job_ids = {
+            job_id for job_id in first_passing if job_id is not None and self.job_contains_submission(job_id, sub)
+        }
+        if not job_ids:
+            return
+        log.debug("Validating %d older jobs in the dashboard", len(job_ids))
+        list(self.lookups.map(self.prefetch_job_validation, job_ids))
+
     def _reject(self, sub: SubReq, reason: str) -> bool:
         log.info(reason, ms2str(sub))
         if self.comment and sub.submission:
@@ -202,8 +395,91 @@ class Approver:
 
         return True
 
+    def known_job_acceptance(self, api: str, job_id: int, sub: int) -> bool | None:
+        """Check if a not-ok job is acceptable for a submission without looking up its older jobs.
+
+        None is returned for a not-ok aggregate job whose older jobs were not checked by a
+        previous run.
+        """
+        try:
+            if sub in self.acceptable_for(job_id):
+                return True
+        except JobNotFoundError:
+            return True
+        if api != "api/jobs/update/":
+            return False
+        store = self.fingerprints
+        result = store.recorded(f"{OLDER_JOB_RESULT_PREFIX}{job_id}:{sub}") if store is not None else None
+        return None if result is None else result == OlderJobResult.OK.name
+
+    def setting_state(self, state: list[Any], api: str, job_aggr: JobAggr, sub: SubReq) -> JobResult | None:
+        """Add the not-ok jobs of a job setting up to the first one not acceptable for a submission to a state."""
+        not_ok_jobs = self.get_setting_jobs(api, job_aggr.id, sub.type)
+        if not_ok_jobs is None:
+            state.append((api, job_aggr.id, None))
+            return JobResult.NO_JOBS
+        jobs: list[tuple[int, str | None, str, bool]] = []
+        state.append((api, job_aggr.id, jobs))
+        for job in not_ok_jobs:
+            acceptable = self.known_job_acceptance(api, job["job_id"], sub.sub)
+            if acceptable is None:
+                return None
+            jobs.append((job["job_id"], job.get("name"), job["status"], acceptable))
+            if not acceptable:
+                return JobResult.FAILED
+        return JobResult.PASSED
+
+    def settings_state(self, state: list[Any], api: str, jobs: list[JobAggr], sub: SubReq) -> JobResult | None:
+        """Add the job settings of a submission up to the first failed one to a state, returning their result."""
+        results = []
+        for job_aggr in jobs:
+            result = self.setting_state(state, api, job_aggr, sub)
+            if result is None or result is JobResult.FAILED:
+                return result
+            results.append(result)
+        return summarize_results(results)
+
+    def result_fingerprint(self, sub: SubReq) -> str | None:
+        """Return a digest of the job results a submission is evaluated on.
+
+        The job settings are visited in the order of the evaluation up to the first not-ok job
+        which is not acceptable. No digest is returned if the job results cannot be fetched or
+        the older jobs of a not-ok aggregate job were not checked by a previous run.
+        """
+        try:
+            s_jobs, a_jobs = self.job_settings(sub)
+            state: list[Any] = [sub.req, sub.scm_info, [(s.id, s.with_aggregate) for s in s_jobs]]
+            result = self.settings_state(state, "api/jobs/incident/", s_jobs, sub)
+            if result is JobResult.PASSED and any(s.with_aggregate for s in s_jobs):
+                result = self.settings_state(state, "api/jobs/update/", a_jobs, sub)
+        except requests.RequestException:
+            return None
+        return None if result is None else fingerprint(state)
+
     def approvable(self, sub: SubReq) -> bool:
-        """Check if a submission is ready for approval."""
+        """Check if a submission is ready for approval.
+
+        With a state file, a submission found not ready before is skipped as long as the job
+        results it was evaluated on are unchanged.
+        """
+        store = self.fingerprints
+        if store is None:
+            return self.evaluate(sub)
+        key, digest = ms2str(sub), self.result_fingerprint(sub)
+        if digest is not None and store.is_unchanged(key, digest):
+            log.info("Approval check for %s skipped: Job results unchanged since last check", key)
+            return False
+        if self.evaluate(sub):
+            return True
+        # the older jobs of not-ok aggregate jobs are known once evaluated
+        if digest is None:
+            digest = self.result_fingerprint(sub)
+        if digest is not None:
+            store.record(key, digest)
+        return False
+
+    def evaluate(self, sub: SubReq) -> bool:
+        """Evaluate the job results of a submission."""
         try:
             s_jobs = get_submission_settings(sub.sub, all_submissions=self.all_submissions, submission_type=sub.type)
         except NoResultsError as e:
@@ -242,15 +518,25 @@ class Approver:
                 e,
             )
 
-    @lru_cache(maxsize=512)  # ruff: ignore[cached-instance-method]
-    def is_job_marked_acceptable_for_submission(self, job_id: int, sub: int) -> bool:
-        """Check if a job is marked as acceptable for a submission."""
-        regex = re.compile(ACCEPTABLE_FOR_TEMPLATE.format(sub=sub), re.DOTALL)
+    @lru_cache(maxsize=4096)  # ruff: ignore[cached-instance-method]
+    def acceptable_for(self, job_id: int) -> frozenset[int]:
+        """Return the submissions a job is marked as acceptable for in its openQA comments.
+
+        The comments of a job are fetched and scanned once per run for all submissions.
+        """
         try:
             comments = self.client.get_job_comments(job_id)
-            return any(regex.search(sanitize_comment_text(comment["text"])) for comment in comments)
         except RequestError:
-            return False
+            return frozenset()
+        return frozenset(
+            int(marker.group(1))
+            for comment in comments
+            for marker in ACCEPTABLE_FOR_PATTERN.finditer(sanitize_comment_text(comment["text"]))
+        )
+
+    def is_job_marked_acceptable_for_submission(self, job_id: int, sub: int) -> bool:
+        """Check if a job is marked as acceptable for a submission."""
+        return sub in self.acceptable_for(job_id)
 
     @staticmethod
     @lru_cache(maxsize=512)
@@ -270,13 +556,20 @@ class Approver:
             return False
         return True
 
-    @lru_cache(maxsize=16384)  # ruff: ignore[cached-instance-method]
+    @lru_cache(maxsize=4096)  # ruff: ignore[cached-instance-method]
+    def job_submissions(self, job_id: int) -> frozenset[int]:
+        """Return the maintenance incidents referenced in a job settings.
+
+        The settings of a job are fetched and scanned once per run for all submissions.
+        """
+        job_settings = self.older_jobs.get(job_id) or self.client.get_single_job(job_id)
+        if not job_settings:
+            return frozenset()
+        return frozenset(int(sub) for sub in MAINTENANCE_INCIDENT_PATTERN.findall(str(job_settings)))
+
     def job_contains_submission(self, job_id: int, sub: int) -> bool:
         """Check if a job settings contain the submission under test."""
-        job_settings = self.client.get_single_job(job_id)
-        if not job_settings:
-            return False
-        return f"{MAINTENANCE_INCIDENT_IDENTIFIER}{sub}/" in str(job_settings)
+        return sub in self.job_submissions(job_id)
 
     def was_older_job_ok(
         self,
@@ -331,21 +624,31 @@ class Approver:
 
     @lru_cache(maxsize=512)  # ruff: ignore[cached-instance-method]
     def was_ok_before(self, not_ok_job_id: int, sub: int) -> bool:
-        """Check if a similar job was successful before."""
-        # We need a considerable amount of older jobs, since there could be many failed manual restarts from same day
-        jobs = self.client.get_older_jobs(not_ok_job_id, 20)
+        """Check if a similar job was successful before.
+
+        With a state file the result is remembered if the older jobs were found, so later runs
+        can tell whether the submission is still waiting on the same not-ok job without them.
+        """
+        jobs = self.older_job_history(not_ok_job_id)
         data = jobs.get("data", [])
         if len(data) == 0:
             log.info("Cannot find older jobs for not-ok job %s", not_ok_job_id)
             return False
 
+        result = self.older_job_result(not_ok_job_id, sub, data)
+        if self.fingerprints is not None:
+            self.fingerprints.record(f"{OLDER_JOB_RESULT_PREFIX}{not_ok_job_id}:{sub}", result.name)
+        return result is OlderJobResult.OK
+
+    def older_job_result(self, not_ok_job_id: int, sub: int, data: list[dict]) -> OlderJobResult:
+        """Check the older jobs of a not-ok job for one which can be used instead."""
         current_job, older_jobs = data[0], data[1:]
         current_build = current_job["build"][:-2]
         try:
             current_build_date = datetime.strptime(current_build, "%Y%m%d").astimezone(UTC)
         except (ValueError, TypeError):
             log.info("Could not parse build date '%s', cannot check for older jobs.", current_build)
-            return False
+            return OlderJobResult.NOT_OK
 
         # Use at most X days old build. Don't go back in time too much to reduce risk of using invalid tests
         oldest_build_usable = current_build_date - timedelta(days=config.settings.oldest_approval_job_days)
@@ -354,22 +657,15 @@ class Approver:
             if (
                 was_ok := self.was_older_job_ok(not_ok_job_id, sub, job, oldest_build_usable)
             ) is not OlderJobResult.KEEP_SEARCHING:
-                return was_ok is OlderJobResult.OK
+                return was_ok
         log.info(
             "Cannot ignore aggregate failure %s for aggregate %s: No suitable older jobs found.", not_ok_job_id, sub
         )
-        return False
-
-    @staticmethod
-    def is_job_passing(job_result: dict) -> bool:
-        """Check if a job result status is passed."""
-        return job_result["status"] == "passed"
+        return OlderJobResult.NOT_OK
 
     def mark_jobs_as_acceptable_for_submission(self, job_results: list[dict], sub: int) -> None:
         """Mark not-ok jobs as acceptable if they have corresponding openQA comments."""
         for job_result in job_results:
-            if self.is_job_passing(job_result):
-                continue
             job_id = job_result["job_id"]
             try:
                 if self.is_job_marked_acceptable_for_submission(job_id, sub):
@@ -380,9 +676,7 @@ class Approver:
                 self.client.handle_job_not_found(job_id)
 
     def is_job_acceptable(self, sub: int, api: str, job_result: dict, submission_type: str | None = None) -> bool:
-        """Determine if a job result is acceptable for approval."""
-        if self.is_job_passing(job_result):
-            return True
+        """Determine if a not-ok job result is acceptable for approval."""
         job_id = job_result["job_id"]
         url = f"{self.client.url.geturl()}/t{job_id}"
         s_type = submission_type or self.submission_type or config.settings.default_submission_type
@@ -409,22 +703,46 @@ class Approver:
         log.info("Found not-ok, not-ignored job %s for submission %s:%s", url, s_type, sub)
         return False
 
+    @staticmethod
+    def fetch_job_results(api: str, settings_id: int, submission_type: str | None = None) -> Any:  # ruff: ignore[any-type]
+        """Fetch the results of all jobs of an aggregate or incident setting from the dashboard."""
+        params = {"type": submission_type} if submission_type else {}
+        return dashboard.get_json(
+            api + str(settings_id), headers=config_module.settings.dashboard_token_dict, params=params
+        )
+
+    @lru_cache(maxsize=1024)  # ruff: ignore[cached-instance-method]
+    def get_setting_jobs(self, api: str, settings_id: int, submission_type: str | None = None) -> list[dict] | None:
+        """Fetch and reduce the job results of an aggregate or incident setting once for all its submissions.
+
+        Returns the not passing jobs of the most recent run of every scenario or None if the
+        setting has no jobs.
+        """
+        job_results = self.fetch_job_results(api, settings_id, submission_type)
+        if not job_results:
+            return None
+        if not isinstance(job_results, list):
+            log.warning("Unexpected job results format for job_aggr %s: %s", settings_id, job_results)
+            return None
+        count, not_ok_jobs = reduce_job_results(job_results)
+        if count < len(job_results):
+            log.debug("Deduplicated %d jobs to %d for job_aggr %s", len(job_results), count, settings_id)
+        return not_ok_jobs
+
     @lru_cache(maxsize=128)  # ruff: ignore[cached-instance-method]
     def get_jobs(self, job_aggr: JobAggr, api: str, sub: int, submission_type: str | None = None) -> JobResult:
         """Retrieve jobs for a specific aggregate or incident setting.
 
+        Only the checks whether not passing jobs are acceptable for the submission run per
+        submission, the job results are shared by all submissions of the setting.
+
         Note: Results are cached. If new job clones are created in openQA after
         caching, the stale cached result may be returned. Cache is keyed by
         (job_aggr.id, api, sub, submission_type). Consider manual cache_clear()
         if fresh data is needed.
         """
-        params = {}
-        if submission_type:
-            params["type"] = submission_type
-        job_results = dashboard.get_json(
-            api + str(job_aggr.id), headers=config_module.settings.dashboard_token_dict, params=params
-        )
-        if not job_results:
+        not_ok_jobs = self.get_setting_jobs(api, job_aggr.id, submission_type)
+        if not_ok_jobs is None:
             log.info(
                 "Job setting %s not found for submission %s:%s",
                 job_aggr.id,
@@ -432,39 +750,39 @@ class Approver:
                 sub,
             )
             return JobResult.NO_JOBS
-        if not isinstance(job_results, list):
-            log.warning("Unexpected job results format for job_aggr %s: %s", job_aggr.id, job_results)
-            return JobResult.NO_JOBS
-        original_count = len(job_results)
-        job_results = deduplicate_jobs_by_scenario(job_results)
-        if len(job_results) < original_count:
-            log.debug(
-                "Deduplicated %d jobs to %d for job_aggr %s",
-                original_count,
-                len(job_results),
-                job_aggr.id,
+        self.mark_jobs_as_acceptable_for_submission(not_ok_jobs, sub)
+        if api == "api/jobs/update/":
+            self.prefetch_older_jobs(
+                [r["job_id"] for r in not_ok_jobs if not r.get("obsolete") and not r.get(f"acceptable_for_{sub}")],
+                sub,
             )
-        self.mark_jobs_as_acceptable_for_submission(job_results, sub)
-        if all(self.is_job_acceptable(sub, api, r, submission_type=submission_type) for r in job_results):
+        if all(self.is_job_acceptable(sub, api, r, submission_type=submission_type) for r in not_ok_jobs):
             return JobResult.PASSED
         return JobResult.FAILED
 
     def get_submission_result(
         self, jobs: list[JobAggr], api: str, sub: int, submission_type: str | None = None
     ) -> JobResult:
-        """Summarize results for all jobs of a submission."""
+        """Summarize results for all jobs of a submission.
+
+        If a single submission is evaluated its job settings are evaluated concurrently and
+        the evaluation of the remaining job settings is cancelled as soon as one of them failed.
+        """
         if not jobs:
             return JobResult.NO_JOBS
+        if not self.concurrent_settings:
+            return summarize_results(
+                self.get_jobs(job_aggr, api, sub, submission_type=submission_type) for job_aggr in jobs
+            )
 
-        has_passed = False
-        for job_aggr in jobs:
-            success = self.get_jobs(job_aggr, api, sub, submission_type=submission_type)
-            if success is JobResult.FAILED:
-                return JobResult.FAILED
-            if success is JobResult.PASSED:
-                has_passed = True
-
-        return JobResult.PASSED if has_passed else JobResult.NO_JOBS
+        with ThreadPoolExecutor(max_workers=config.settings.max_workers) as executor:
+            futures = [
+                executor.submit(self.get_jobs, job_aggr, api, sub, submission_type=submission_type) for job_aggr in jobs
+            ]
+            try:
+                return summarize_results(future.result() for future in as_completed(futures))
+            finally:
+                executor.shutdown(cancel_futures=True)
 
     def approve(self, sub: SubReq) -> bool:
         """Approve a submission in OBS or Gitea."""
@@ -82,6 +82,35 @@ class Settings(BaseSettings):
     singlearch: Path = Field(default=Path("/etc/openqabot/singlearch.yml"), alias="QEM_BOT_SINGLEARCH")
     retry: int = Field(default=2, alias="QEM_BOT_RETRY")
     max_workers: int | None = Field(default=None, alias="QEM_BOT_MAX_WORKERS")
+    # How many computed openQA posts may wait for a free posting thread
+    post_queue_size: int = Field(default=100, alias="QEM_BOT_POST_QUEUE_SIZE")
+    # Additional posting threads only sending posts more urgent than the default priority
+    urgent_post_workers: int = Field(default=0, alias="QEM_BOT_URGENT_POST_WORKERS")
+    # Upper bound for the adaptive number of concurrent openQA isos posts
+    post_iso_max_concurrency: int = Field(default=16, alias="QEM_BOT_POST_ISO_MAX_CONCURRENCY")
+    # Seconds an openQA isos post may take before the concurrency is reduced
+    post_iso_latency_target: float = Field(default=30.0, alias="QEM_BOT_POST_ISO_LATENCY_TARGET")
+    # Let openQA create the jobs of posted products in the background and poll their state
+    async_schedule: bool = Field(default=False, alias="QEM_BOT_ASYNC_SCHEDULE")
+    async_schedule_poll_interval: float = Field(default=10.0, alias="QEM_BOT_ASYNC_SCHEDULE_POLL_INTERVAL")
+    async_schedule_timeout: float = Field(default=1800.0, alias="QEM_BOT_ASYNC_SCHEDULE_TIMEOUT")
+    # Seconds Public Cloud image queries are cached
+    pc_query_ttl: float = Field(default=900.0, alias="QEM_BOT_PC_QUERY_TTL")
+    # File persisting fingerprints of submissions which needed no new openQA job for incremental runs
+    state_file: Path | None = Field(default=None, alias="QEM_BOT_STATE_FILE")
+    # Seconds after which a submission is evaluated again even if unchanged
+    state_max_age: float = Field(default=6 * 3600, alias="QEM_BOT_STATE_MAX_AGE")
+    # Seconds into a run after which no further metadata worker evaluation is started;
+    # skipped workers are kept in QEM_BOT_STATE_FILE and evaluated first by the next run,
+    # so the budget is ignored without a state file
+    run_budget: float | None = Field(default=None, alias="QEM_BOT_RUN_BUDGET")
+    # Seconds without further finished jobs after which the AMQP listener evaluates a
+    # submission for approval, so a burst of finished jobs results in a single evaluation
+    approval_debounce: float = Field(default=60.0, alias="QEM_BOT_APPROVAL_DEBOUNCE")
+    # Maximum seconds the evaluation of a submission is postponed by its finished jobs
+    approval_max_delay: float = Field(default=600.0, alias="QEM_BOT_APPROVAL_MAX_DELAY")
+    # File persisting fingerprints of the job results of submissions found not ready for approval
+    approve_state_file: Path | None = Field(default=None, alias="QEM_BOT_APPROVE_STATE_FILE")
     approve_comment: bool = Field(default=False, alias="QEM_BOT_APPROVE_COMMENT")
 
     # App-specific settings
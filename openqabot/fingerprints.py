@@ -0,0 +1,89 @@
+# Copyright SUSE LLC
+# SPDX-License-Identifier: MIT
+"""Persisted fingerprints for incremental scheduling runs."""
+
+from __future__ import annotations
+
+import json
+import threading
+from hashlib import md5
+from logging import getLogger
+from time import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+log = getLogger("bot.fingerprints")
+
+DEFERRED_PREFIX = "deferred:"
+
+
+def fingerprint(*state: Any) -> str:  # ruff: ignore[any-type]
+    """Return a digest of JSON serializable state."""
+    return md5(json.dumps(state, sort_keys=True, default=str).encode(), usedforsecurity=False).hexdigest()
+
+
+class FingerprintStore:
+    """Fingerprints of (submission, worker) combinations which did not need any new openQA job.
+
+    A combination with an unchanged fingerprint can be skipped on later runs until its
+    entry is older than the configured maximum age. Work skipped for lack of time is
+    kept as well so the next run can start with it.
+    """
+
+    def __init__(self, path: Path, max_age: float) -> None:
+        """Initialize the FingerprintStore class."""
+        self.path = path
+        self.max_age = max_age
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Load the non-expired entries from the file, keeping the store empty if it cannot be read."""
+        try:
+            entries = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning("Fingerprint state %s ignored: %s", self.path, e)
+            return
+        oldest = time() - self.max_age
+        self._entries = {key: entry for key, entry in entries.items() if entry["time"] >= oldest}
+        log.info("Loaded %d fingerprints from %s", len(self._entries), self.path)
+
+    def is_unchanged(self, key: str, digest: str) -> bool:
+        """Check if a combination was recorded with the same fingerprint."""
+        entry = self._entries.get(key)
+        return entry is not None and entry["fingerprint"] == digest
+
+    def recorded(self, key: str) -> str | None:
+        """Return the fingerprint a combination was recorded with, if any."""
+        entry = self._entries.get(key)
+        return None if entry is None else entry["fingerprint"]
+
+    def record(self, key: str, digest: str) -> None:
+        """Remember the fingerprint of a combination which did not need any new openQA job."""
+        with self._lock:
+            self._entries[key] = {"fingerprint": digest, "time": time()}
+
+    def defer(self, key: str) -> None:
+        """Remember work which was skipped for lack of time."""
+        with self._lock:
+            self._entries[f"{DEFERRED_PREFIX}{key}"] = {"fingerprint": None, "time": time()}
+
+    def take_deferred(self) -> set[str]:
+        """Return and forget the keys of all work skipped by previous runs for lack of time."""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(DEFERRED_PREFIX)]
+            for key in keys:
+                del self._entries[key]
+        return {key.removeprefix(DEFERRED_PREFIX) for key in keys}
+
+    def save(self) -> None:
+        """Write the store atomically."""
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with self._lock:
+            tmp.write_text(json.dumps(self._entries, sort_keys=True))
+        tmp.replace(self.path)
+        log.info("Saved %d fingerprints to %s", len(self._entries), self.path)
@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from http import HTTPStatus
 from itertools import batched
@@ -18,7 +19,7 @@ from openqa_client.exceptions import RequestError
 
 import openqabot.config as config_module
 from openqabot import config
-from openqabot.utils import number_of_retries
+from openqabot.utils import AdaptiveLimiter, number_of_retries
 
 from .errors import JobNotFoundError, PostOpenQAError
 from .loader.qem import update_job
@@ -45,6 +46,11 @@ class OpenQAInterface:
         self.openqa = OpenQA_Client(server=self.url.netloc, scheme=self.url.scheme)
         self.openqa.session.verify = not config_module.settings.insecure
         self.retries = number_of_retries()
+        self.post_limiter = AdaptiveLimiter(
+            config_module.settings.post_iso_max_concurrency,
+            config_module.settings.post_iso_latency_target,
+            self.is_congestion,
+        )
         user_agent = {"User-Agent": "python-OpenQA_Client/qem-bot/1.0.0"}
         self.openqa.session.headers.update(user_agent)
 
@@ -55,8 +61,19 @@ class OpenQAInterface:
         """
         return self.url.netloc == config.settings.main_openqa_domain
 
-    def post_iso(self, settings: dict[str, Any]) -> None:
-        """Post a job to openQA with the given settings."""
+    @staticmethod
+    def is_congestion(error: Exception) -> bool:
+        """Check if an error signals an overloaded openQA instead of a rejected request."""
+        if isinstance(error, RequestError):
+            return error.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        return True
+
+    def post_iso(self, settings: dict[str, Any], *, scheduled_async: bool = False) -> int | None:
+        """Post a job to openQA with the given settings.
+
+        With scheduled_async openQA creates the jobs in the background and the id of the
+        scheduled product is returned to poll its status later on.
+        """
         log.info(
             "openqa-cli api --host %s -X post isos %s",
             self.url.geturl(),
@@ -64,20 +81,44 @@ class OpenQAInterface:
         )
         if self.dry:
             log.info("OpenQA post_job skipped due dry run mode")
-            return
+            return None
+        data = {**settings, "async": 1} if scheduled_async else settings
         try:
-            self.openqa.openqa_request("POST", "isos", data=settings, retries=self.retries)
+            with self.post_limiter.slot():
+                ret = self.openqa.openqa_request("POST", "isos", data=data, retries=self.retries)
+            product_id = ret.get("scheduled_product_id") if scheduled_async else None
         except RequestError as e:
             (_, _, status_code, text, *_) = e.args
             if status_code == HTTPStatus.NOT_FOUND and "no templates found" in str(text):
                 log.info("Skipping job POST, no openQA templates for product (test-owner scope): %s", text)
-                return
+                return None
             log.exception("openQA API error: %s", text)
             log.exception("Job POST failed for settings: %s", pformat(settings))
             raise PostOpenQAError from e
         except Exception as e:
             log.exception("Job POST failed for settings: %s", pformat(settings))
             raise PostOpenQAError from e
+        if scheduled_async and product_id is None:
+            log.warning("openQA returned no scheduled product, assuming the jobs were created: %s", ret)
+        return product_id
+
+    def get_scheduled_products(self, product_ids: list[int]) -> dict[int, dict[str, Any]]:
+        """Fetch the state of asynchronously scheduled products, skipping failed requests."""
+
+        def fetch(product_id: int) -> dict[str, Any] | None:
+            try:
+                return self.openqa.openqa_request("GET", f"isos/{product_id}", retries=self.retries)
+            except (RequestError, requests.exceptions.RequestException):
+                log.exception("openQA API error when fetching scheduled product %s", product_id)
+            return None
+
+        with ThreadPoolExecutor(max_workers=config.settings.max_workers) as executor:
+            products = executor.map(fetch, product_ids)
+            return {
+                product_id: product
+                for product_id, product in zip(product_ids, products, strict=True)
+                if product is not None
+            }
 
     @staticmethod
     def handle_job_not_found(job_id: int) -> None:
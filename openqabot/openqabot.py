@@ -2,22 +2,93 @@
 # SPDX-License-Identifier: MIT
 """Main OpenQABot logic."""
 
-from argparse import Namespace
-from concurrent.futures import ThreadPoolExecutor, wait
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from heapq import heappop, heappush
+from itertools import chain, count
 from logging import getLogger
-from os import environ
-from typing import Any
+from os import environ, process_cpu_count
+from threading import Condition, Lock
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Any
+
+import requests
 
 import openqabot.config as config_module
-from openqabot import dashboard
+from openqabot import dashboard, pc_helper
 
 from .errors import PostOpenQAError
+from .fingerprints import FingerprintStore, fingerprint
 from .loader.config import get_onearch, load_metadata
 from .loader.qem import get_submissions
 from .openqa import OpenQAInterface
+from .types.aggregate import Aggregate
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+    from collections.abc import Sequence
+
+    from .types.baseconf import BaseConf
 
 log = getLogger("bot.openqabot")
 
+SCHEDULED_PRODUCT_FINAL_STATES = frozenset({"scheduled", "cancelled"})
+
+
+class PostQueue:
+    """Bounded queue handing out the most urgent pending post first.
+
+    Posts are ordered by their openQA ``_PRIORITY`` (lower is more urgent, e.g. emu
+    submissions) and then by arrival, so posts of equal priority keep the metadata order.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize the PostQueue class."""
+        self.maxsize = maxsize
+        self._heap: list[tuple[int, int, dict[str, Any]]] = []
+        self._seq = count()
+        self._closed = False
+        self._cond = Condition()
+
+    @staticmethod
+    def priority(job: dict[str, Any]) -> int:
+        """Return the openQA priority of a post, openQA's default if none is set."""
+        return int(job["openqa"].get("_PRIORITY", config_module.settings.base_prio))
+
+    @staticmethod
+    def is_urgent(priority: int) -> bool:
+        """Check if a priority is more urgent than openQA's default."""
+        return priority < config_module.settings.base_prio
+
+    def put(self, job: dict[str, Any]) -> None:
+        """Add a post, waiting while the queue is full."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._heap) < self.maxsize)
+            heappush(self._heap, (self.priority(job), next(self._seq), job))
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """Signal that no more posts will be added."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get(self, *, urgent_only: bool = False) -> dict[str, Any] | None:
+        """Return the most urgent post or None once the queue is closed and drained."""
+
+        def available() -> bool:
+            return bool(self._heap) and (not urgent_only or self.is_urgent(self._heap[0][0]))
+
+        with self._cond:
+            self._cond.wait_for(lambda: available() or self._closed)
+            if not available():
+                return None
+            job = heappop(self._heap)[2]
+            self._cond.notify_all()
+            return job
+
 
 class OpenQABot:
     """Main OpenQABot logic."""
@@ -25,6 +96,7 @@ class OpenQABot:
     def __init__(self, args: Namespace) -> None:
         """Initialize the OpenQABot class."""
         log.info("Starting bot schedule")
+        self.started = monotonic()
         self.dry = args.dry
         self.ignore_onetime = args.ignore_onetime
         self.submission_arg = args.submission if hasattr(args, "submission") else None
@@ -43,8 +115,59 @@ class OpenQABot:
             extrasettings=extrasettings,
         )
 
+        self.fingerprints = self.load_fingerprints()
+        self.run_budget = self.load_run_budget()
+        pc_helper.prefetch_queries(chain.from_iterable(worker.settings_sources() for worker in self.workers))
+        self.prefetch_aggregate_history()
+
         self.openqa = OpenQAInterface()
         self.ci = environ.get("CI_JOB_URL")
+        # posts of asynchronously scheduled products by their scheduled product id
+        self.scheduled: dict[int, list[dict[str, Any]]] = {}
+        # outcome of every distinct set of openQA settings posted in this run
+        self.openqa_posts: dict[str, Future[int | None]] = {}
+        self.openqa_posts_lock = Lock()
+        # workers not evaluated as the time budget was spent
+        self.deferred: list[BaseConf] = []
+
+    def load_fingerprints(self) -> FingerprintStore | None:
+        """Load the state of a previous run if configured.
+
+        The fingerprints are handed to all workers unless onetime settings are ignored; the
+        workers deferred by a previous run are resumed in any case.
+        """
+        settings = config_module.settings
+        if settings.state_file is None:
+            return None
+        store = FingerprintStore(settings.state_file, settings.state_max_age)
+        store.load()
+        if not self.ignore_onetime:
+            for worker in self.workers:
+                worker.fingerprints = store
+        return store
+
+    def load_run_budget(self) -> float | None:
+        """Return the time budget for starting worker evaluations.
+
+        Deferred workers are only resumed first by the next run through the state file, so
+        without one the budget is ignored rather than skipping the same workers every run.
+        """
+        budget = config_module.settings.run_budget
+        if budget is not None and self.fingerprints is None:
+            log.warning("Time budget of %ss ignored: Deferred workers can only be resumed with a state file", budget)
+            return None
+        return budget
+
+    def prefetch_aggregate_history(self) -> None:
+        """Fetch the previous aggregate jobs of every aggregate product and arch in parallel."""
+        product_archs = [
+            (worker, arch) for worker in self.workers if isinstance(worker, Aggregate) for arch in worker.archs
+        ]
+        if not product_archs:
+            return
+        log.debug("Prefetching previous aggregate jobs for %d product archs", len(product_archs))
+        with ThreadPoolExecutor(max_workers=config_module.settings.max_workers) as executor:
+            list(executor.map(lambda product_arch: product_arch[0].prefetch_old_jobs(product_arch[1]), product_archs))
 
     def post_qem(self, data: dict[str, Any], api: str) -> None:
         """Update dashboard database with job results."""
@@ -60,27 +183,175 @@ class OpenQABot:
         res_id = res.json().get("id", "unknown")
         log.info("Dashboard update successful for %s: Status %s, Database ID %s", api, res.status_code, res_id)
 
-    def post_openqa(self, data: dict[str, Any]) -> None:
-        """Post a job to openQA."""
-        self.openqa.post_iso(data)
+    def post_openqa(self, data: dict[str, Any]) -> int | None:
+        """Post a job to openQA, returning the scheduled product id if scheduled asynchronously."""
+        return self.openqa.post_iso(data, scheduled_async=config_module.settings.async_schedule)
 
-    def __call__(self) -> int:
-        """Run the bot schedule."""
-        log.info("Entering bot main loop")
-        post = [p for w in self.workers for p in w(self.submissions, self.ci, ignore_onetime=self.ignore_onetime)]
+    def post_openqa_once(self, data: dict[str, Any]) -> int | None:
+        """Post a job to openQA unless identical settings were already posted in this run.
 
-        log.info("Triggering %d products in openQA", len(post))
+        Duplicates share the outcome of the first post, so every dashboard record is still
+        written if the post succeeded.
+        """
+        key = fingerprint(data)
+        with self.openqa_posts_lock:
+            first = key not in self.openqa_posts
+            if first:
+                self.openqa_posts[key] = Future()
+            outcome = self.openqa_posts[key]
+        if not first:
+            log.info("Skipping duplicate openQA post for %s %s", data.get("FLAVOR"), data.get("ARCH"))
+            return outcome.result()
+        try:
+            product_id = self.post_openqa(data)
+        except BaseException as e:
+            # duplicates wait for the outcome, so it has to be resolved whatever happened
+            outcome.set_exception(e)
+            raise
+        outcome.set_result(product_id)
+        return product_id
 
-        def poster(job: dict[str, Any]) -> None:
-            log.info("Triggering job with details from dashboard: %s", job)
-            try:
-                self.post_openqa(job["openqa"])
-            except PostOpenQAError:
-                log.info("Skipping dashboard update: Job post failed")
-            else:
-                self.post_qem(job["qem"], job["api"])
+    def ordered_workers(self) -> Sequence[BaseConf]:
+        """Return the metadata workers in the order their evaluation is started.
+
+        With a time budget the workers deferred by previous runs come first, followed by
+        the workers with the most urgent posts; otherwise the metadata order is kept.
+        """
+        if self.run_budget is None or self.fingerprints is None:
+            return self.workers
+        deferred = self.fingerprints.take_deferred()
+        return sorted(self.workers, key=lambda worker: (worker.fingerprint not in deferred, worker.priority()))
+
+    def out_of_budget(self) -> bool:
+        """Check if the time budget for starting worker evaluations is spent."""
+        return self.run_budget is not None and monotonic() - self.started >= self.run_budget
+
+    def run_worker(self, worker: BaseConf, queue: PostQueue) -> int:
+        """Evaluate a single metadata worker against all submissions, queueing each post as soon as it is built.
+
+        A worker is deferred to the next run instead if the time budget is spent.
+
+        Returns:
+            The number of queued posts.
 
+        """
+        if self.fingerprints is not None and self.out_of_budget():
+            self.deferred.append(worker)
+            self.fingerprints.defer(worker.fingerprint)
+            return 0
+        posts = 0
+        for job in worker(self.submissions, self.ci, ignore_onetime=self.ignore_onetime):
+            queue.put(job)
+            posts += 1
+        return posts
+
+    def queue_posts(self, queue: PostQueue) -> int:
+        """Evaluate all metadata workers in parallel, streaming their posts into the queue.
+
+        The queue is bounded, so a worker only keeps computing while its posts are sent and
+        no worker holds more than the post it is about to queue.
+
+        Returns:
+            The number of queued posts.
+
+        """
         with ThreadPoolExecutor(max_workers=config_module.settings.max_workers) as executor:
-            wait([executor.submit(poster, job) for job in post])
+            return sum(executor.map(partial(self.run_worker, queue=queue), self.ordered_workers()))
+
+    def poster(self, job: dict[str, Any]) -> None:
+        """Post a job to openQA and update the dashboard on success."""
+        log.info("Triggering job with details from dashboard: %s", job)
+        try:
+            product_id = self.post_openqa_once(job["openqa"])
+        except PostOpenQAError:
+            log.info("Skipping dashboard update: Job post failed")
+            return
+        if product_id is not None:
+            with self.openqa_posts_lock:
+                self.scheduled.setdefault(product_id, []).append(job)
+            return
+        self.update_dashboard(job)
+
+    def update_dashboard(self, job: dict[str, Any]) -> None:
+        """Update the dashboard for a posted job, logging failures."""
+        try:
+            self.post_qem(job["qem"], job["api"])
+        except requests.RequestException:
+            log.exception("Dashboard update failed for %s", job["api"])
+
+    def await_scheduled(self) -> None:
+        """Update the dashboard once openQA finished scheduling the asynchronously posted products.
+
+        The state of all pending products is polled in batches until every product is
+        scheduled or cancelled or the configured timeout is reached.
+        """
+        settings = config_module.settings
+        deadline = monotonic() + settings.async_schedule_timeout
+        while self.scheduled:
+            products = self.openqa.get_scheduled_products(list(self.scheduled))
+            for product_id, product in products.items():
+                if product.get("status") not in SCHEDULED_PRODUCT_FINAL_STATES:
+                    continue
+                jobs = self.scheduled.pop(product_id)
+                if product["status"] == "scheduled" and not (product.get("results") or {}).get("error"):
+                    for job in jobs:
+                        self.update_dashboard(job)
+                else:
+                    log.info("Skipping dashboard update: Scheduling of product %s failed: %s", product_id, product)
+            if not self.scheduled:
+                break
+            if monotonic() >= deadline:
+                log.warning(
+                    "Skipping dashboard update: Products %s not scheduled within %ss",
+                    ", ".join(map(str, self.scheduled)),
+                    settings.async_schedule_timeout,
+                )
+                break
+            sleep(settings.async_schedule_poll_interval)
+
+    def post_loop(self, queue: PostQueue, *, urgent_only: bool = False) -> None:
+        """Post jobs from the queue until it is closed and drained.
+
+        Failures are logged per job, so a posting thread keeps serving the queue.
+        """
+        while (job := queue.get(urgent_only=urgent_only)) is not None:
+            try:
+                self.poster(job)
+            except Exception:
+                log.exception("Posting job failed: %s", job["openqa"])
+
+    def __call__(self) -> int:
+        """Run the bot schedule.
+
+        Posts are sent while the workers are still computing; the number of posts
+        waiting for a free posting thread is bounded to limit memory usage. Waiting posts
+        are sent most urgent first and optionally additional posting threads are reserved
+        for urgent posts only.
+        """
+        log.info("Entering bot main loop")
+        settings = config_module.settings
+        queue = PostQueue(settings.post_queue_size)
+        # same default as ThreadPoolExecutor
+        posters = settings.max_workers or min(32, (process_cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=posters + settings.urgent_post_workers) as executor:
+            for _ in range(posters):
+                executor.submit(self.post_loop, queue)
+            for _ in range(settings.urgent_post_workers):
+                executor.submit(self.post_loop, queue, urgent_only=True)
+            try:
+                jobs = self.queue_posts(queue)
+            finally:
+                queue.close()
+        self.await_scheduled()
+        if self.deferred:
+            log.warning(
+                "Time budget of %ss spent: Deferred %d of %d metadata workers to the next run",
+                self.run_budget,
+                len(self.deferred),
+                len(self.workers),
+            )
+        if self.fingerprints is not None and not self.dry:
+            self.fingerprints.save()
+        log.info("Triggered %d products in openQA", jobs)
         log.info("Bot run completed")
         return 0
@@ -6,17 +6,96 @@ from __future__ import annotations
 
 import json
 import re
-from functools import cache
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from logging import getLogger
 from operator import itemgetter
-from typing import Any
+from time import monotonic
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import requests
 
+from . import config
 from .utils import retry5 as retried_requests
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
 log = getLogger("openqabot.pc_helper")
 
+PINT_STATES = ("active", "inactive", "deprecated")
+
+
+class _CachedQuery(NamedTuple):
+    expires: float
+    result: Future[Any]
+
+
+_QUERY_CACHE: dict[str, _CachedQuery] = {}
+_QUERY_LOCK = threading.Lock()
+
+
+def clear_query_cache() -> None:
+    """Clear the shared cache of Public Cloud queries."""
+    with _QUERY_LOCK:
+        _QUERY_CACHE.clear()
+
+
+def _cached(key: str, compute: Callable[[], Any]) -> Any:  # ruff: ignore[any-type]
+    """Return the shared result of compute for key, computing it at most once per TTL.
+
+    Concurrent callers wait for a single computation. Failures are not cached.
+    """
+    with _QUERY_LOCK:
+        entry = _QUERY_CACHE.get(key)
+        fetch = entry is None or entry.expires <= monotonic()
+        if fetch:
+            entry = _QUERY_CACHE[key] = _CachedQuery(monotonic() + config.settings.pc_query_ttl, Future())
+    if fetch:
+        try:
+            entry.result.set_result(compute())
+        except BaseException as e:
+            entry.result.set_exception(e)
+            with _QUERY_LOCK:
+                _QUERY_CACHE.pop(key, None)
+            raise
+    return entry.result.result()
+
+
+def query_json(query: str) -> Any:  # ruff: ignore[any-type]
+    """Fetch the JSON document of a Public Cloud query.
+
+    Results are shared by all callers for QEM_BOT_PC_QUERY_TTL seconds and concurrent
+    requests for the same query wait for a single fetch. Failed queries are not cached.
+    """
+    return _cached(query, lambda: retried_requests.get(query).json())
+
+
+def _prefetch(query: str) -> None:
+    try:
+        query_json(query)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        log.debug("Public Cloud query prefetch failed: Query %s: %s", query, e)
+
+
+def prefetch_queries(settings_sources: Iterable[dict[str, Any]]) -> None:
+    """Fetch all Public Cloud queries found in the given settings in parallel.
+
+    Only active PINT images are prefetched, other states are fetched on demand.
+    """
+    queries = set()
+    for settings in settings_sources:
+        if "PUBLIC_CLOUD_TOOLS_IMAGE_QUERY" in settings:
+            queries.add(settings["PUBLIC_CLOUD_TOOLS_IMAGE_QUERY"])
+        if "PUBLIC_CLOUD_PINT_QUERY" in settings:
+            queries.add(f"{settings['PUBLIC_CLOUD_PINT_QUERY']}{PINT_STATES[0]}.json")
+    if not queries:
+        return
+    log.info("Prefetching %d Public Cloud queries", len(queries))
+    with ThreadPoolExecutor(max_workers=config.settings.max_workers) as executor:
+        list(executor.map(_prefetch, sorted(queries)))
+
 
 def get_latest_tools_image(query: str) -> str | None:
     """Get latest tools image.
@@ -26,7 +105,7 @@ def get_latest_tools_image(query: str) -> str | None:
     a value for <BUILD NUM>
     """
     # Get the first not-failing item
-    build_results = retried_requests.get(query).json()["build_results"]
+    build_results = query_json(query)["build_results"]
     return next(
         ("publiccloud_tools_{}.qcow2".format(build["build"]) for build in build_results if build["failed"] == 0),
         None,
@@ -50,13 +129,48 @@ def apply_pc_tools_image(settings: dict[str, Any]) -> dict[str, Any]:
     return settings
 
 
-@cache
 def pint_query(query: str) -> dict[str, Any]:
     """Perform a pint query.
 
     Successive queries are cached
     """
-    return retried_requests.get(query).json()
+    return query_json(query)
+
+
+class PintIndex:
+    """Images of a PINT response indexed by state and region, newest first.
+
+    A lookup only matches the name regex against the images of the requested state and
+    region and stops at the newest match.
+    """
+
+    def __init__(self, images: list[dict[str, Any]]) -> None:
+        """Initialize the PintIndex class."""
+        self.by_key: dict[tuple[str | None, str | None], list[dict[str, Any]]] = {}
+        for image in sorted(images, key=itemgetter("publishedon"), reverse=True):
+            for key in (
+                (None, None),
+                (image["state"], None),
+                (None, image["region"]),
+                (image["state"], image["region"]),
+            ):
+                self.by_key.setdefault(key, []).append(image)
+
+    def recent(self, name_regex: str, region: str | None = None, state: str | None = "active") -> dict[str, Any] | None:
+        """Return the most recently published image matching name, region and state."""
+        name = _name_pattern(name_regex)
+        images = self.by_key.get((state, region or None), [])
+        return next((image for image in images if name.match(image["name"]) is not None), None)
+
+
+@lru_cache(maxsize=256)
+def _name_pattern(name_regex: str) -> re.Pattern[str]:
+    return re.compile(name_regex)
+
+
+def pint_index(query: str) -> PintIndex:
+    """Return the index of a pint query, shared like the query itself."""
+    return _cached(f"index:{query}", lambda: PintIndex(pint_query(query)["images"]))
 
 
 def apply_publiccloud_pint_image(settings: dict[str, Any]) -> dict[str, Any]:
@@ -70,8 +184,8 @@ def apply_publiccloud_pint_image(settings: dict[str, Any]) -> dict[str, Any]:
         # We need to include active and inactive images. Active images have precedence
         # inactive images are maintained PC images which only receive security updates.
         # See https://www.suse.com/c/suse-public-cloud-image-life-cycle/
-        for state in ["active", "inactive", "deprecated"]:
-            images = pint_query(f"{settings['PUBLIC_CLOUD_PINT_QUERY']}{state}.json")["images"]
+        for state in PINT_STATES:
+            images = pint_index(f"{settings['PUBLIC_CLOUD_PINT_QUERY']}{state}.json")
             image = get_recent_pint_image(images, settings["PUBLIC_CLOUD_PINT_NAME"], region, state=state)
             if image is not None:
                 break
@@ -104,36 +218,25 @@ def apply_publiccloud_pint_image(settings: dict[str, Any]) -> dict[str, Any]:
 
 
 def get_recent_pint_image(
-    images: list[dict[str, Any]],
+    images: list[dict[str, Any]] | PintIndex,
     name_regex: str,
     region: str | None = None,
-    state: str = "active",
+    state: str | None = "active",
 ) -> dict[str, Any] | None:
     """Get most recent PINT image.
 
-    From the given set of images (received json from pint),
+    From the given set of images (received json from pint or its index),
     get the latest one that matches the given criteria:
      - name given as regular expression,
      - region given as string,
      - state given the state of the image
 
-    Get the latest one based on 'publishedon'
+    Get the latest one based on 'publishedon'. State and region criteria can be omitted by
+    setting them to None, because certain public cloud providers do not make a distinction
+    on e.g. the region.
     """
-    name = re.compile(name_regex)
-
-    # Apply selection criteria: state and region criteria can be omitted by setting the corresponding variable to None
-    # This is required, because certain public cloud providers do not make a distinction on e.g. the region and thus
-    # this check is not needed there
-    filtered_images = [
-        image
-        for image in images
-        if name.match(image["name"]) is not None
-        and (state is None or image["state"] == state)
-        and (region is None or not region or region == image["region"])
-    ]
-    if not filtered_images:
-        return None
-    return max(filtered_images, key=itemgetter("publishedon"))
+    index = images if isinstance(images, PintIndex) else PintIndex(images)
+    return index.recent(name_regex, region, state)
 
 
 def apply_public_cloud_settings(settings: dict[str, Any]) -> dict[str, Any] | None:
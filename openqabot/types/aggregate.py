@@ -6,6 +6,7 @@ from __future__ import annotations
 
 import datetime
 from collections import defaultdict
+from contextlib import suppress
 from datetime import UTC
 from itertools import chain
 from logging import getLogger
@@ -19,9 +20,12 @@ from openqabot.loader.repohash import merge_repohash
 from openqabot.pc_helper import apply_public_cloud_settings
 
 from .baseconf import BaseConf, JobConfig
+from .submission import PackageMatcher
 from .types import ChannelType, ProdVer, Repos, get_channel_type
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from .submission import Submission
 
 log = getLogger("bot.types.aggregate")
@@ -54,8 +58,8 @@ class Aggregate(BaseConf):
         self.flavor = config.config["FLAVOR"]
         self.archs = config.config["archs"]
         self.onetime = config.config.get("onetime", False)
-        self.packages = config.config.get("packages")
-        self.excluded_packages = config.config.get("excluded_packages")
+        self.packages = self._compile_packages(config.config.get("packages"))
+        self.excluded_packages = self._compile_packages(config.config.get("excluded_packages"))
         self.test_issues = self.normalize_repos(config.config)
 
     def _warn_unknown_keys(self, config_dict: dict[str, Any]) -> None:
@@ -69,6 +73,10 @@ class Aggregate(BaseConf):
         for key in unknown_keys:
             log.warning("Aggregate (product %s): Ignoring unknown metadata key %r", self.product, key)
 
+    @staticmethod
+    def _compile_packages(requires: list[str] | None) -> PackageMatcher | None:
+        return None if requires is None else PackageMatcher.of(requires)
+
     @staticmethod
     def normalize_repos(config: dict[str, Any]) -> dict[str, ProdVer]:
         """Normalize repository configuration from config.settings."""
@@ -232,6 +240,19 @@ class Aggregate(BaseConf):
         setting_hashes: set[str] = {str(settings_data[key]) for key in setting_keys if settings_data.get(key)}
         return merge_repohash(sorted(submission_hashes | setting_hashes))
 
+    def get_old_jobs(self, arch: str) -> list[dict[str, Any]]:
+        """Fetch the settings of previous aggregate jobs for an arch, cached for the run."""
+        return dashboard.get_json(
+            "api/update_settings",
+            params={"product": self.product, "arch": arch},
+            headers=config.settings.dashboard_token_dict,
+        )
+
+    def prefetch_old_jobs(self, arch: str) -> None:
+        """Warm the cache of previous aggregate jobs, errors are reported when processing the arch."""
+        with suppress(requests.exceptions.RequestException):
+            self.get_old_jobs(arch)
+
     def process_arch(
         self,
         arch: str,
@@ -253,11 +274,7 @@ class Aggregate(BaseConf):
         repohash = self._compute_repohash(test_submissions, settings_data, issues_arch, self.test_issues)
 
         try:
-            old_jobs = dashboard.get_json(
-                "api/update_settings",
-                params={"product": self.product, "arch": arch},
-                headers=config.settings.dashboard_token_dict,
-            )
+            old_jobs = self.get_old_jobs(arch)
         except requests.exceptions.JSONDecodeError:
             log.exception("Dashboard API error: Invalid JSON received for aggregate jobs")
             old_jobs = None
@@ -302,14 +319,17 @@ class Aggregate(BaseConf):
         ci_url: str | None,
         *,
         ignore_onetime: bool = False,
-    ) -> list[dict[str, Any]]:
-        """Process all architectures and return a list of posts for the dashboard."""
+    ) -> Iterator[dict[str, Any]]:
+        """Process all architectures and yield the posts for the dashboard one at a time.
+
+        Yields:
+            Posts for openQA and the dashboard.
+
+        """
         valid_submissions = self.filter_submissions(submissions)
         for s in valid_submissions:
             s.compute_revisions_for_product_repo(None, None)
 
-        results = [
-            self.process_arch(arch, valid_submissions, ci_url, ignore_onetime=ignore_onetime) for arch in self.archs
-        ]
-
-        return [res for res in results if res is not None]
+        for arch in self.archs:
+            if (res := self.process_arch(arch, valid_submissions, ci_url, ignore_onetime=ignore_onetime)) is not None:
+                yield res
@@ -8,7 +8,14 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
+import openqabot.config as config_module
+from openqabot.fingerprints import fingerprint
+
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from openqabot.fingerprints import FingerprintStore
+
     from .submission import Submission
 
 
@@ -34,6 +41,16 @@ class BaseConf(ABC):
         self.product_version = config.product_version
         self.settings = config.settings
         self.global_excluded_packages = config.global_excluded_packages
+        self.fingerprint = fingerprint(
+            config.product,
+            config.product_repo,
+            config.product_version,
+            config.settings,
+            config.config,
+            config.global_excluded_packages,
+        )
+        # optional store to skip submissions unchanged since a previous run
+        self.fingerprints: FingerprintStore | None = None
 
     def is_globally_excluded(self, submission: Submission) -> bool:
         """Check if a submission matches the central (cross-product) blocklist."""
@@ -46,8 +63,8 @@ class BaseConf(ABC):
         ci_url: str | None,
         *,
         ignore_onetime: bool,
-    ) -> list[dict[str, Any]]:
-        """Run the configuration's main processing logic."""
+    ) -> Iterator[dict[str, Any]]:
+        """Run the configuration's main processing logic, yielding each post as soon as it is built."""
         # pragma: no cover
 
     @staticmethod
@@ -56,6 +73,14 @@ class BaseConf(ABC):
         """Normalize repository configuration."""
         # pragma: no cover
 
+    def priority(self) -> int:  # ruff: ignore[no-self-use] - overridden by configurations with flavor priorities
+        """Return the most urgent openQA priority the posts of this configuration get by default."""
+        return config_module.settings.base_prio
+
+    def settings_sources(self) -> list[dict[str, Any]]:
+        """Return all settings dictionaries of this configuration which can end up in openQA posts."""
+        return [self.settings]
+
     def filter_embargoed(self, flavor: str) -> bool:
         """Check if embargoed submissions should be filtered out for a given flavor."""
         return any(k.startswith("PUBLIC") for k in self.settings) or any(
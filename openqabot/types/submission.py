@@ -6,17 +6,27 @@ from __future__ import annotations
 
 import html
 import re
+import sys
+import threading
+from bisect import bisect_right
 from collections import defaultdict
+from concurrent.futures import Future
+from functools import cache
+from itertools import chain
 from logging import getLogger
-from typing import Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 from openqabot import config
 from openqabot.errors import EmptyChannelsError, EmptyPackagesError, NoRepoFoundError
+from openqabot.fingerprints import fingerprint
 from openqabot.loader import gitea
 from openqabot.loader.repohash import RepoOptions, get_max_revision
 
 from .types import ArchVer, ChannelType, Repos, get_channel_type
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
 log = getLogger("bot.types.submission")
 version_pattern = re.compile(r"(\d+(?:[.-](?:SP)?\d+)?)")
 
@@ -73,31 +83,198 @@ def sort_packages(names: list[str]) -> list[str]:
     return sorted(names, key=_package_sort_key)
 
 
+# generic tooling package which must never match a broad "kernel-livepatch" entry
+_NEVER_MATCHED_PACKAGE = "kernel-livepatch-tools"
+
+
+class PackageMatcher:
+    """Compiled form of a package include/exclude list from metadata.
+
+    An entry prefixed with ``=`` matches a package name exactly; any other
+    entry matches by prefix. Prefixes covered by a shorter prefix are dropped
+    so the remaining ones are prefix-free and sorted, which lets a single
+    binary search find the only candidate prefix for a package name.
+    """
+
+    __slots__ = ("exact", "prefixes")
+
+    def __init__(self, requires: Iterable[str]) -> None:
+        """Initialize the PackageMatcher class."""
+        self.exact: frozenset[str] = frozenset(r[1:] for r in requires if r.startswith("="))
+        prefixes: list[str] = []
+        for r in sorted({r for r in requires if not r.startswith("=")}):
+            if not prefixes or not r.startswith(prefixes[-1]):
+                prefixes.append(r)
+        self.prefixes: tuple[str, ...] = tuple(prefixes)
+
+    def __repr__(self) -> str:
+        """Return a representation of the PackageMatcher."""
+        return f"<PackageMatcher exact: {sorted(self.exact)} prefixes: {list(self.prefixes)}>"
+
+    @staticmethod
+    def of(requires: Sequence[str] | PackageMatcher) -> PackageMatcher:
+        """Return the compiled matcher for a package list, reusing one compiled before."""
+        return requires if isinstance(requires, PackageMatcher) else _compile_packages(tuple(requires))
+
+    def matches(self, package: str) -> bool:
+        """Check if a single package name matches."""
+        if package in self.exact:
+            return True
+        idx = bisect_right(self.prefixes, package)
+        return idx > 0 and package.startswith(self.prefixes[idx - 1])
+
+    def matches_any(self, packages: Iterable[str]) -> bool:
+        """Check if any of the given package names matches."""
+        return any(p != _NEVER_MATCHED_PACKAGE and self.matches(p) for p in packages)
+
+
+@cache
+def _compile_packages(requires: tuple[str, ...]) -> PackageMatcher:
+    return PackageMatcher(requires)
+
+
+# one Repos instance per distinct channel, shared by all submissions building on it
+_SHARED_REPOS: dict[Repos, Repos] = {}
+
+
+def _shared_repos(product: str, version: str, arch: str, product_version: str = "") -> Repos:
+    """Return the shared Repos instance of a channel with interned strings."""
+    repo = Repos(sys.intern(product), sys.intern(version), sys.intern(arch), sys.intern(product_version))
+    return _SHARED_REPOS.setdefault(repo, repo)
+
+
+class _ParsedChannel(NamedTuple):
+    kind: int  # channels are ordered by kind: SUSE:Updates with arch, without arch, SLFO
+    repo: Repos | None
+    product: str | None = None  # product name of SLFO channels, filtered by the configured OBS products
+
+
+@cache
+def _parse_channel(raw: str) -> _ParsedChannel:
+    """Parse a raw channel string; the same strings repeat across submissions so each is parsed once."""
+    if raw.startswith("SUSE:Updates"):
+        val = raw.split(":")[2:]
+        # remove Manager-Server on aarch64 from channels
+        if (
+            len(val) == EXPECTED_PART_LENGTH_WITH_ARCH
+            and val[0] != "SLE-Module-Development-Tools-OBS"
+            and not (val[0] == "SLE-Module-SUSE-Manager-Server" and val[2] == "aarch64")
+        ):
+            return _ParsedChannel(0, _shared_repos(val[0], val[1], val[2]))
+        if len(val) == EXPECTED_PART_LENGTH_NO_ARCH:
+            return _ParsedChannel(1, _shared_repos(val[0], val[1], "x86_64"))
+    elif raw.startswith("SUSE:SLFO"):
+        val = raw.split(":")
+        if len(val) > EXPECTED_PART_LENGTH_WITH_ARCH:
+            obs_project = ":".join(val[2:-1])
+            product = sys.intern(gitea.get_product_name(obs_project))
+            return _ParsedChannel(2, _shared_repos(":".join(val[0:2]), obs_project, *(val[-1].split("#"))), product)
+    return _ParsedChannel(0, None)
+
+
+def clear_channel_cache() -> None:
+    """Forget all parsed channels."""
+    _parse_channel.cache_clear()
+
+
 class Submission:
-    """Information about a submission."""
+    """Information about a submission.
+
+    Thousands of submissions are kept per run, so they are slotted and share their
+    channel, project and package strings.
+    """
+
+    __slots__ = (
+        "_current",
+        "_logged_skipped",
+        "_package_matches",
+        "_revisions_by_params",
+        "_revisions_lock",
+        "channels",
+        "embargoed",
+        "emu",
+        "id",
+        "livepatch",
+        "ongoing",
+        "packages",
+        "priority",
+        "project",
+        "rev_logged",
+        "rr",
+        "rrid",
+        "skipped_products",
+        "staging",
+        "type",
+        "url",
+    )
 
     def __init__(self, submission: dict[str, Any]) -> None:
         """Initialize the Submission class."""
         self.rr: int | None = submission["rr_number"]
-        self.project: str = submission["project"]
+        self.project: str = sys.intern(submission["project"])
         self.id: int = submission["number"]
         self.rrid: str | None = f"{self.project}:{self.rr}" if self.rr else None
         self.staging: bool = not submission["inReview"]
         self.ongoing: bool = submission["isActive"] and submission["inReviewQAM"] and not submission["approved"]
         self.embargoed: bool = submission["embargoed"]
         self.priority: int | None = submission.get("priority")
-        self.type: str = submission.get("type") or config.settings.default_submission_type
+        self.type: str = sys.intern(submission.get("type") or config.settings.default_submission_type)
         self.url: str | None = submission.get("url")
 
         self._initialize_channels([item for item in submission.get("channels") or [] if item])
         self._validate_channels()
         self._initialize_packages([item for item in submission.get("packages") or [] if item])
         self.emu: bool = submission["emu"]
-        self.revisions: dict[ArchVer, int] | None = None  # lazy-initialized via revisions_with_fallback()
-        self.rev_cache_params: tuple[Any, ...] | None = None
+        # Submissions are shared by workers evaluated in parallel: computed revisions are cached per
+        # parameters for all threads while the selection used by revisions_with_fallback() is per thread.
+        # Concurrent callers with the same parameters wait for a single computation.
+        self._current = threading.local()
+        self._revisions_by_params: dict[tuple[Any, ...], Future[dict[ArchVer, int] | None]] = {}
+        self._revisions_lock = threading.Lock()
         self.rev_logged: bool = False
         self._logged_skipped: bool = False
         self.livepatch: bool = self.is_livepatch(self.packages)
+        self._package_matches: dict[PackageMatcher, bool] = {}
+
+    @property
+    def revisions(self) -> dict[ArchVer, int] | None:
+        """Repohashes selected by the last computation in the current thread.
+
+        Lazy-initialized via revisions_with_fallback().
+        """
+        return getattr(self._current, "revisions", None)
+
+    @revisions.setter
+    def revisions(self, value: dict[ArchVer, int] | None) -> None:
+        self._current.revisions = value
+
+    @property
+    def rev_cache_params(self) -> tuple[Any, ...] | None:
+        """Parameters of the last revisions computation in the current thread."""
+        return getattr(self._current, "params", None)
+
+    @rev_cache_params.setter
+    def rev_cache_params(self, value: tuple[Any, ...] | None) -> None:
+        self._current.params = value
+
+    def fingerprint(self) -> str:
+        """Return a digest of the state deciding which openQA jobs are needed for this submission.
+
+        Covers the repohashes selected by the last computation in the current thread.
+        """
+        return fingerprint(
+            self.type,
+            self.id,
+            self.rrid,
+            self.staging,
+            self.ongoing,
+            self.embargoed,
+            self.priority,
+            self.emu,
+            self.channels,
+            self.packages,
+            sorted((*arch_ver, rev) for arch_ver, rev in (self.revisions or {}).items()),
+        )
 
     @property
     def is_gitea(self) -> bool:
@@ -123,40 +300,26 @@ class Submission:
 
     def _initialize_packages(self, raw_packages: list[str]) -> None:
         """Initialize packages from raw package data."""
-        self.packages: list[str] = sort_packages(raw_packages)
+        self.packages: list[str] = sort_packages([sys.intern(p) for p in raw_packages])
         if not self.packages:
             raise EmptyPackagesError(self.project)
 
     @staticmethod
     def _parse_channels(raw_channels: list[str]) -> tuple[list[Repos], set[str]]:
-        updates_3, updates_2, slfo = [], [], []
+        obs_products = config.settings.obs_products_set
+        by_kind: tuple[list[Repos], ...] = ([], [], [])
         skipped = set()
 
         for r in raw_channels:
-            if r.startswith("SUSE:Updates"):
-                val = r.split(":")[2:]
-                if len(val) == EXPECTED_PART_LENGTH_WITH_ARCH and val[0] != "SLE-Module-Development-Tools-OBS":
-                    updates_3.append(Repos(val[0], val[1], val[2]))
-                elif len(val) == EXPECTED_PART_LENGTH_NO_ARCH:
-                    updates_2.append(Repos(val[0], val[1], "x86_64"))
-            elif r.startswith("SUSE:SLFO"):
-                val = r.split(":")
-                if len(val) > EXPECTED_PART_LENGTH_WITH_ARCH:
-                    obs_project = ":".join(val[2:-1])
-                    product = gitea.get_product_name(obs_project)
-                    if "all" in config.settings.obs_products_set or product in config.settings.obs_products_set:
-                        slfo.append(Repos(":".join(val[0:2]), obs_project, *(val[-1].split("#"))))
-                    else:
-                        skipped.add(product)
-
-        # remove Manager-Server on aarch64 from channels
-        filtered_channels = [
-            chan
-            for chan in (updates_3 + updates_2 + slfo)
-            if not (chan.product == "SLE-Module-SUSE-Manager-Server" and chan.arch == "aarch64")
-        ]
+            parsed = _parse_channel(r)
+            if parsed.repo is None:
+                continue
+            if parsed.product is None or "all" in obs_products or parsed.product in obs_products:
+                by_kind[parsed.kind].append(parsed.repo)
+            else:
+                skipped.add(parsed.product)
 
-        return filtered_channels, skipped
+        return list(chain.from_iterable(by_kind)), skipped
 
     def log_skipped(self) -> None:
         """Log products that were skipped during channel initialization."""
@@ -186,16 +349,42 @@ class Submission:
         limit_archs: set[str] | None = None,
     ) -> bool:
         """Calculate repohashes for all channels of this submission."""
-        params = (product_repo, product_version, frozenset(limit_archs) if limit_archs else None)
+        params = (
+            tuple(product_repo) if isinstance(product_repo, list) else product_repo,
+            product_version,
+            frozenset(limit_archs) if limit_archs else None,
+        )
         if self.rev_cache_params == params:
             return self.revisions is not None
 
         self.rev_cache_params = params
+        with self._revisions_lock:
+            compute = params not in self._revisions_by_params
+            if compute:
+                self._revisions_by_params[params] = Future()
+            revisions = self._revisions_by_params[params]
+        if compute:
+            try:
+                revisions.set_result(self._compute_revisions(product_repo, product_version, limit_archs))
+            except BaseException as e:
+                revisions.set_exception(e)
+                with self._revisions_lock:
+                    self._revisions_by_params.pop(params, None)
+                raise
+        self.revisions = revisions.result()
+        return self.revisions is not None
+
+    def _compute_revisions(
+        self,
+        product_repo: list[str] | str | None,
+        product_version: str | None,
+        limit_archs: set[str] | None,
+    ) -> dict[ArchVer, int] | None:
         product_name = product_repo[-1] if isinstance(product_repo, list) else product_repo
         opts = RepoOptions(product_name, product_version, str(self))
 
         try:
-            self.revisions = self.rev(
+            return self.rev(
                 self.channels,
                 self.project,
                 opts,
@@ -207,10 +396,7 @@ class Submission:
                 msg = f"{msg}: {e}" if len(str(e)) > 0 else msg
                 log.info(msg, self, self.project)
                 self.rev_logged = True
-            self.revisions = None
-            return False
-        else:
-            return True
+            return None
 
     def revisions_with_fallback(self, arch: str, ver: str) -> int | None:
         """Return the repohash for a specific architecture and version, with fallback for SLE12."""
@@ -296,17 +482,15 @@ class Submission:
             return False
         return any(p.startswith(("kgraft-patch-", "kernel-livepatch")) for p in packages)
 
-    def contains_package(self, requires: list[str]) -> bool:
+    def contains_package(self, requires: Sequence[str] | PackageMatcher) -> bool:
         """Check if the submission contains any of the required packages.
 
         An entry prefixed with ``=`` matches a package name exactly; any other
         entry matches by prefix (the default). This lets configs opt into
         precise matching, e.g. ``=kernel-default`` to avoid catching
-        ``kernel-default-devel``.
+        ``kernel-default-devel``. Results are memoized per compiled list.
         """
-        exact = {r[1:] for r in requires if r.startswith("=")}
-        prefixes = tuple(r for r in requires if not r.startswith("="))
-        return any(
-            p != "kernel-livepatch-tools" and (p in exact or (bool(prefixes) and p.startswith(prefixes)))
-            for p in self.packages
-        )
+        matcher = PackageMatcher.of(requires)
+        if (matched := self._package_matches.get(matcher)) is None:
+            matched = self._package_matches[matcher] = matcher.matches_any(self.packages)
+        return matched
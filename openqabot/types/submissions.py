@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 import json
+from itertools import starmap
 from logging import getLogger
 from typing import TYPE_CHECKING, Any, NamedTuple
 
@@ -17,9 +18,12 @@ from openqabot.pc_helper import apply_pc_tools_image, apply_publiccloud_pint_ima
 from openqabot.utils import retry3 as retried_requests
 
 from .baseconf import BaseConf, JobConfig
+from .submission import PackageMatcher
 from .types import ChannelType, ProdVer, Repos, get_channel_type
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from .submission import Submission
 
 log = getLogger("bot.types.submissions")
@@ -37,6 +41,7 @@ VALID_FLAVOR_KEYS = frozenset({
     "excluded_packages",
     "params_expand",
 })
+PACKAGE_LIST_KEYS = frozenset({"packages", "excluded_packages"})
 
 
 class SubContext(NamedTuple):
@@ -53,6 +58,8 @@ class SubConfig(NamedTuple):
 
     ci_url: str | None
     ignore_onetime: bool
+    # submissions skipped because of transient errors, never recorded as unchanged
+    unsettled: set[str] | None = None
 
 
 class Submissions(BaseConf):
@@ -85,21 +92,29 @@ class Submissions(BaseConf):
             for key in unknown_keys:
                 log.warning("Flavor %s (product %s): Ignoring unknown metadata key %r", flavor, self.product, key)
 
+    @staticmethod
+    def _normalize_flavor_value(key: str, value: Any) -> Any:  # ruff: ignore[any-type]
+        if key == "issues":
+            return {template: ProdVer.from_issue_channel(channel) for template, channel in value.items()}
+        if key in PACKAGE_LIST_KEYS and value is not None:
+            return PackageMatcher.of(value)
+        return value
+
     @staticmethod
     def normalize_repos(config: dict[str, Any]) -> dict[str, Any]:
-        """Normalize repository configuration from settings."""
+        """Normalize repository configuration from settings.
+
+        Package lists are compiled into matchers once per configuration.
+        """
         return {
-            flavor: {
-                key: (
-                    {template: ProdVer.from_issue_channel(channel) for template, channel in value.items()}
-                    if key == "issues"
-                    else value
-                )
-                for key, value in data.items()
-            }
+            flavor: {key: Submissions._normalize_flavor_value(key, value) for key, value in data.items()}
             for flavor, data in config.items()
         }
 
+    def settings_sources(self) -> list[dict[str, Any]]:
+        """Return the settings and the 'params_expand' settings of all flavors."""
+        return [self.settings, *(data["params_expand"] for data in self.flavors.values() if "params_expand" in data)]
+
     @staticmethod
     def repo_osuse(chan: Repos) -> tuple[str, str, str] | tuple[str, str]:
         """Return repository components for openSUSE or other products."""
@@ -120,7 +135,9 @@ class Submissions(BaseConf):
         return res if isinstance(res, list) else []
 
     @staticmethod
-    def is_scheduled_job(ctx: SubContext, ver: str, submission_type: str | None = None) -> bool:
+    def is_scheduled_job(
+        ctx: SubContext, ver: str, submission_type: str | None = None, unsettled: set[str] | None = None
+    ) -> bool:
         """Check if a job is already scheduled in the dashboard.
 
         If the dashboard API fails, treat the job as already scheduled so a
@@ -132,6 +149,8 @@ class Submissions(BaseConf):
         try:
             jobs = Submissions._get_scheduled_jobs(ctx.sub.id, submission_type)
         except DashboardError:
+            if unsettled is not None:
+                unsettled.add(str(ctx.sub))
             return True
 
         return any(
@@ -212,7 +231,7 @@ class Submissions(BaseConf):
             return True
 
         if not cfg.ignore_onetime and self.is_scheduled_job(
-            ctx, self.settings["VERSION"], submission_type=ctx.sub.type
+            ctx, self.settings["VERSION"], submission_type=ctx.sub.type, unsettled=cfg.unsettled
         ):
             log.info("Submission %s already scheduled for %s on %s", ctx.sub, ctx.flavor, ctx.arch)
             return True
@@ -240,20 +259,29 @@ class Submissions(BaseConf):
             **({"RRID": sub.rrid} if sub.rrid else {}),
         }
 
+    @staticmethod
+    def flavor_priority_delta(flavor: str, data: dict[str, Any]) -> int:
+        """Calculate the job priority delta of a flavor before considering the submission."""
+        if "override_priority" in data:
+            return data["override_priority"] - 50
+        return 5 if flavor.endswith("Minimal") else 10
+
     @staticmethod
     def get_priority(ctx: SubContext) -> int:
         """Calculate job priority for a submission."""
         sub, flavor, data = ctx.sub, ctx.flavor, ctx.data
-        if "override_priority" in data:
-            delta_prio = data["override_priority"] - 50
-        else:
-            delta_prio = 5 if flavor.endswith("Minimal") else 10
+        delta_prio = Submissions.flavor_priority_delta(flavor, data)
+        if "override_priority" not in data:
             if sub.emu:
                 delta_prio = -20
             if sub.priority is not None:
                 delta_prio -= sub.priority // settings.priority_scale
         return settings.base_prio + delta_prio
 
+    def priority(self) -> int:
+        """Return the most urgent job priority of all flavors before considering the submissions."""
+        return settings.base_prio + min(starmap(self.flavor_priority_delta, self.flavors.items()), default=0)
+
     @staticmethod
     def apply_params_expand(settings: dict[str, Any], data: dict[str, Any], flavor: str) -> bool:
         """Apply 'params_expand' settings from metadata."""
@@ -320,7 +348,10 @@ class Submissions(BaseConf):
             return None
 
         self.add_metadata_urls(settings, ctx.sub)
-        return self.apply_pc_images(settings)
+        settings = self.apply_pc_images(settings)
+        if settings is None and cfg.unsettled is not None:
+            cfg.unsettled.add(str(ctx.sub))
+        return settings
 
     def handle_submission(self, ctx: SubContext, cfg: SubConfig) -> dict[str, Any] | None:
         """Process a submission context and return dashboard post data."""
@@ -369,18 +400,45 @@ class Submissions(BaseConf):
         ci_url: str | None,
         *,
         ignore_onetime: bool,
-    ) -> list[dict[str, Any]]:
-        """Process all submissions and return a list of posts for the dashboard."""
-        cfg = SubConfig(ci_url=ci_url, ignore_onetime=ignore_onetime)
+    ) -> Iterator[dict[str, Any]]:
+        """Process all submissions and yield the posts for the dashboard one at a time.
+
+        With a fingerprint store, submissions unchanged since a run in which they needed no
+        new openQA job are skipped before any dashboard lookup.
+
+        Yields:
+            Posts for openQA and the dashboard.
+
+        """
+        store = None if ignore_onetime else self.fingerprints
+        unsettled: set[str] = set()
+        cfg = SubConfig(ci_url=ci_url, ignore_onetime=ignore_onetime, unsettled=unsettled)
 
         active = [
             s for s in submissions if s.compute_revisions_for_product_repo(self.product_repo, self.product_version)
         ]
-
-        return [
-            r
+        digests = {}
+        if store is not None:
+            digests = {str(sub): (f"{sub}:{self.fingerprint}", sub.fingerprint()) for sub in active}
+            unchanged = {key for key, digest in digests.items() if store.is_unchanged(*digest)}
+            if unchanged:
+                log.info("%s: Skipping %d submissions unchanged since the last run", self, len(unchanged))
+            active = [sub for sub in active if str(sub) not in unchanged]
+
+        results = (
+            (str(sub), r)
             for flavor, data in self.flavors.items()
             for arch in data["archs"]
             for sub in active
             if (r := self.process_sub_context(SubContext(sub, arch, flavor, data), cfg))
-        ]
+        )
+        posted: set[str] = set()
+        for key, r in results:
+            posted.add(key)
+            yield r
+
+        # only reached once all posts were consumed
+        if store is not None:
+            for sub in active:
+                if str(sub) not in posted and str(sub) not in unsettled:
+                    store.record(*digests[str(sub)])
@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 from enum import Enum, auto
+from functools import cache
 from typing import TYPE_CHECKING, NamedTuple
 
 from openqabot.config import OBS_REPO_TYPE
@@ -29,8 +30,12 @@ _CHANNEL_PREFIX_MAP = {
 }
 
 
+@cache
 def get_channel_type(product: str) -> ChannelType:
-    """Determine the channel type based on the product string."""
+    """Determine the channel type based on the product string.
+
+    Memoized as the same few products are typed over and over.
+    """
     return next(
         (v for k, v in _CHANNEL_PREFIX_MAP.items() if product.startswith(k)),
         ChannelType.UPDATES,
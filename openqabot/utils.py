@@ -7,7 +7,10 @@ from __future__ import annotations
 import logging
 import os
 import re
+from contextlib import contextmanager
 from copy import deepcopy
+from threading import Condition
+from time import monotonic
 from typing import TYPE_CHECKING, Any
 
 from requests import Session
@@ -15,6 +18,8 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
     from .types.types import Data
 
 
@@ -171,3 +176,59 @@ def extract_contact_from_description(description: str | None) -> str | None:
         return None
     match = CONTACT_PATTERN.search(description)
     return match.group(1).strip() if match else None
+
+
+class AdaptiveLimiter:
+    """Concurrency limit adapted by additive-increase/multiplicative-decrease.
+
+    Every call finishing within the latency target raises the limit by one while at
+    least half of it is used, every slow call or call failing with a congestion error
+    halves it.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        latency_target: float,
+        is_congestion: Callable[[Exception], bool] = lambda _e: True,
+    ) -> None:
+        """Initialize the AdaptiveLimiter class."""
+        self.max_limit = max(1, max_limit)
+        self.latency_target = latency_target
+        self.is_congestion = is_congestion
+        self.limit = 1
+        self.in_flight = 0
+        self._cond = Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait for a free slot and adapt the limit to the outcome of the call.
+
+        Yields:
+            Nothing, the call is made inside the context.
+
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+            saturated = 2 * self.in_flight >= self.limit
+        start = monotonic()
+        congested = True
+        try:
+            yield
+            congested = monotonic() - start > self.latency_target
+        except Exception as e:
+            congested = self.is_congestion(e)
+            saturated = False  # errors never raise the limit
+            raise
+        finally:
+            self._release(congested=congested, saturated=saturated)
+
+    def _release(self, *, congested: bool, saturated: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if congested:
+                self.limit = max(1, self.limit // 2)
+            elif saturated:
+                self.limit = min(self.max_limit, self.limit + 1)
+            self._cond.notify_all()
@@ -22,8 +22,10 @@ from openqabot.errors import NoResultsError
 from openqabot.loader.gitea import read_json_file
 from openqabot.loader.qem import JobAggr
 from openqabot.openqa import OpenQAInterface
+from openqabot.pc_helper import clear_query_cache
 from openqabot.repodiff import Package
 from openqabot.requests import find_request_on_obs, get_obs_request_list
+from openqabot.types.submission import clear_channel_cache
 
 from .helpers import (
     add_two_passed_response,
@@ -126,6 +128,8 @@ def make_approver(submission: int = 0, *, mocker: MockerFixture | None = None, c
 @pytest.fixture(autouse=True)
 def _auto_clear_cache() -> None:
     clear_cache()
+    clear_query_cache()
+    clear_channel_cache()
 
 
 @pytest.fixture(scope="session")
@@ -199,10 +203,12 @@ def fake_qem(request: pytest.FixtureRequest, mocker: MockerFixture) -> None:
     OpenQAInterface.get_older_jobs.cache_clear()
     OpenQAInterface.is_devel_group.cache_clear()
 
-    Approver.is_job_marked_acceptable_for_submission.cache_clear()
+    Approver.acceptable_for.cache_clear()
+    Approver.job_submissions.cache_clear()
     Approver.validate_job_qam.cache_clear()
     Approver.was_ok_before.cache_clear()
     Approver.get_jobs.cache_clear()
+    Approver.get_setting_jobs.cache_clear()
 
 
 @pytest.fixture
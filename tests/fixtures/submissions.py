@@ -4,18 +4,25 @@
 
 from __future__ import annotations
 
-from typing import Any
+import threading
+from typing import TYPE_CHECKING, Any
 
 from openqabot.config import DEFAULT_SUBMISSION_TYPE
-from openqabot.types.submission import Submission
+from openqabot.types.submission import PackageMatcher, Submission
 from openqabot.types.types import ArchVer
 
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
 
 class MockSubmission(Submission):
     """A flexible mock implementation of Submission class for testing."""
 
     def __init__(self, **kwargs: Any) -> None:
         """Initialize the MockSubmission class."""
+        self._current = threading.local()
+        self._revisions_by_params = {}
+        self._revisions_lock = threading.Lock()
         self.id = kwargs.get("id", 0)
         self.staging = kwargs.get("staging", False)
         self.livepatch = kwargs.get("livepatch", False)
@@ -34,6 +41,7 @@ class MockSubmission(Submission):
         self.rev_fallback_value = kwargs.get("rev_fallback_value")
         self.contains_package_value = kwargs.get("contains_package_value")
         self.compute_revisions_value = kwargs.get("compute_revisions_value", True)
+        self._package_matches = {}
 
     def compute_revisions_for_product_repo(
         self,
@@ -53,8 +61,8 @@ class MockSubmission(Submission):
             return self.revisions.get(ArchVer(arch, ver))
         return None
 
-    def contains_package(self, requires: list[str]) -> bool:
+    def contains_package(self, requires: Sequence[str] | PackageMatcher) -> bool:
         """Mock contains_package."""
         if self.contains_package_value is not None:
             return self.contains_package_value
-        return any(p.startswith(tuple(requires)) for p in self.packages)
+        return PackageMatcher.of(requires).matches_any(self.packages)
@@ -88,14 +88,14 @@ def test_aggregate_printable(aggregate_factory: Any) -> None:
 def test_aggregate_call(aggregate_factory: Any) -> None:
     """Test for the bare minimal set of arguments needed by the callable."""
     acc = aggregate_factory()
-    assert acc([], None) == []
+    assert list(acc([], None)) == []
 
 
 @pytest.mark.usefixtures("request_mock")
 def test_aggregate_call_with_archs(aggregate_factory: Any, config: dict) -> None:
     """Configure an archs to enter in the function main loop."""
     acc = aggregate_factory(config=config)
-    assert acc(submissions=[], ci_url=None) == []
+    assert list(acc(submissions=[], ci_url=None)) == []
 
 
 @pytest.mark.usefixtures("request_mock")
@@ -108,7 +108,7 @@ def test_aggregate_call_with_test_issues(
     sub = submission_mock(product="BBBBBBBBB", version="CCCCCCCC", arch="ciao")
     sub2 = submission_mock(product="EEEEEEEEE", version="FFFFFFFF", arch="ciao", sub_id=42)
     mocker.patch("openqabot.types.aggregate.dashboard.get_json", return_value=[{"repohash": "old", "build": "old"}])
-    res = acc(submissions=[sub, sub2], ci_url=None)
+    res = list(acc(submissions=[sub, sub2], ci_url=None))
     assert len(res) == 1
     settings = res[0]["openqa"]
     assert settings["BASE_TEST_ISSUES"] == "123", "BASE_TEST_ISSUES present"
@@ -125,7 +125,7 @@ def test_aggregate_call_pc_pint(aggregate_factory: Any, config: dict, mocker: Mo
         return_value={"PUBLIC_CLOUD_IMAGE_ID": "Hola", "PUBLIC_CLOUD_TOOLS_IMAGE_BASE": "Base"},
     )
     mocker.patch("openqabot.types.aggregate.dashboard.get_json", return_value=[{"repohash": "old", "build": "old"}])
-    acc(submissions=[], ci_url=None)
+    list(acc(submissions=[], ci_url=None))
 
 
 @pytest.mark.usefixtures("request_mock")
@@ -141,7 +141,7 @@ def test_aggregate_call_pc_pint_with_submissions(
     )
     sub = submission_mock(product="BBBBBBBBB", version="CCCCCCCC", arch="ciao")
     mocker.patch("openqabot.types.aggregate.dashboard.get_json", return_value=[{"repohash": "old", "build": "old"}])
-    ret = acc(submissions=[sub], ci_url=None)
+    ret = list(acc(submissions=[sub], ci_url=None))
     assert ret[0]["openqa"]["PUBLIC_CLOUD_IMAGE_ID"] == "Hola"
 
 
@@ -153,7 +153,7 @@ def test_aggregate_call_no_job_settings(
     caplog.set_level(10)  # DEBUG
     acc = aggregate_factory(product="product", config=config)
     mocker.patch("openqabot.types.aggregate.dashboard.get_json", return_value=[])
-    res = acc(submissions=[], ci_url=None)
+    res = list(acc(submissions=[], ci_url=None))
     assert res == []
     assert "No aggregate jobs found for <Aggregate product: product> on arch ciao" in caplog.text
 
@@ -171,7 +171,7 @@ def test_aggregate_call_pc_tools_fail(
 
     sub = submission_mock(product="P", version="V", arch="ciao")
     sub.id = "I"
-    res = acc(submissions=[sub], ci_url=None)
+    res = list(acc(submissions=[sub], ci_url=None))
     assert res == []
     assert "No tools image found for query" in caplog.text
 
@@ -189,7 +189,7 @@ def test_aggregate_call_pc_pint_fail(
 
     sub = submission_mock(product="P", version="V", arch="ciao")
     sub.id = "I"
-    res = acc(submissions=[sub], ci_url=None)
+    res = list(acc(submissions=[sub], ci_url=None))
     assert res == []
     assert "No PINT image found for query" in caplog.text
 
@@ -314,7 +314,7 @@ def test_aggregate_call_ci_url(aggregate_factory: Any, submission_mock: Any, moc
 
     sub = submission_mock(product="P", version="V", arch="A")
     sub.id = "I"
-    res = acc([sub], ci_url="http://ci")
+    res = list(acc([sub], ci_url="http://ci"))
     assert len(res) == 1
     assert res[0]["openqa"]["__CI_JOB_URL"] == "http://ci"
 
@@ -325,7 +325,7 @@ def test_process_arch_json_error(
 ) -> None:
     acc = aggregate_factory("product", config=config)
     mocker.patch("openqabot.types.aggregate.dashboard.get_json", side_effect=requests.JSONDecodeError("msg", "doc", 0))
-    assert acc(submissions=[], ci_url=None) == []
+    assert list(acc(submissions=[], ci_url=None)) == []
     assert "Invalid JSON received for aggregate jobs" in caplog.text
 
 
@@ -335,7 +335,7 @@ def test_process_arch_request_error(
 ) -> None:
     acc = aggregate_factory("product", config=config)
     mocker.patch("openqabot.types.aggregate.dashboard.get_json", side_effect=requests.RequestException("error"))
-    assert acc(submissions=[], ci_url=None) == []
+    assert list(acc(submissions=[], ci_url=None)) == []
     assert "Could not fetch previous aggregate jobs" in caplog.text
 
 
@@ -358,7 +358,7 @@ def test_aggregate_call_deprioritize_limit(aggregate_factory: Any, submission_mo
 
     sub = submission_mock(product="P", version="V", arch="A")
     sub.id = "I"
-    res = acc([sub], ci_url=None)
+    res = list(acc([sub], ci_url=None))
     assert res[0]["openqa"]["_DEPRIORITIZE_LIMIT"] == 10
 
 
@@ -369,7 +369,7 @@ def test_aggregate_call_pc_tools_success(aggregate_factory: Any, submission_mock
     mocker.patch("openqabot.pc_helper.apply_pc_tools_image", return_value={"PUBLIC_CLOUD_TOOLS_IMAGE_BASE": "Base"})
     sub = submission_mock(product="P", version="V", arch="A")
     sub.id = "I"
-    res = acc([sub], ci_url=None)
+    res = list(acc([sub], ci_url=None))
     assert len(res) == 1
     assert res[0]["openqa"]["PUBLIC_CLOUD_TOOLS_IMAGE_BASE"] == "Base"
 
@@ -381,7 +381,7 @@ def test_aggregate_priority(aggregate_factory: Any, submission_mock: Any, mocker
 
     sub = submission_mock(product="P", version="V", arch="A")
     sub.priority = 100
-    res = acc([sub], ci_url=None)
+    res = list(acc([sub], ci_url=None))
     assert res[0]["openqa"]["_PRIORITY"] == 45
 
 
@@ -398,7 +398,7 @@ def test_aggregate_multiple_priority(aggregate_factory: Any, submission_mock: An
     sub2 = submission_mock(product="P", version="V", arch="A")
     sub2.id = 2
     sub2.priority = 200
-    res = acc([sub1, sub2], ci_url=None)
+    res = list(acc([sub1, sub2], ci_url=None))
     assert res[0]["openqa"]["_PRIORITY"] == 40
 
 
@@ -519,3 +519,18 @@ def test_aggregate_url_format(aggregate_factory: Any, mocker: MockerFixture) ->
     assert "?type=" not in dashboard_url
     assert "/incident/42" in dashboard_url
     assert "smelt" not in dashboard_url  # Should be clean of type if it's the default
+
+
+def test_prefetch_old_jobs_served_from_cache(aggregate_factory: Any, config: dict, request_mock: MagicMock) -> None:
+    acc = aggregate_factory("product", config=config)
+    acc.prefetch_old_jobs("ciao")
+    assert acc.get_old_jobs("ciao") == [{}]
+    request_mock.assert_called_once()
+    assert request_mock.call_args.kwargs["params"] == {"product": "product", "arch": "ciao"}
+
+
+def test_prefetch_old_jobs_ignores_errors(aggregate_factory: Any, config: dict, mocker: MockerFixture) -> None:
+    acc = aggregate_factory("product", config=config)
+    get_json = mocker.patch("openqabot.types.aggregate.dashboard.get_json", side_effect=requests.RequestException)
+    acc.prefetch_old_jobs("ciao")
+    get_json.assert_called_once()
@@ -5,16 +5,19 @@
 from __future__ import annotations
 
 import logging
+import threading
 from argparse import Namespace
 from typing import TYPE_CHECKING, cast
 
 import pytest
 import responses
 
-from openqabot.amqp import AMQP
-from openqabot.config import DEFAULT_SUBMISSION_TYPE
+from openqabot.amqp import AMQP, ApprovalWorker
+from openqabot.approver import Approver
+from openqabot.config import DEFAULT_SUBMISSION_TYPE, settings
 
 if TYPE_CHECKING:
+    from pathlib import Path
     from unittest.mock import MagicMock
 
     from pytest_mock import MockerFixture
@@ -48,6 +51,14 @@ def test_handling_aggregate_full_coverage(args: Namespace, mocker: MagicMock) ->
     assert result == 0
 
 
+def test_approval_state_file_unused(args: Namespace, mocker: MockerFixture, tmp_path: Path) -> None:
+    mocker.patch.object(settings, "approve_state_file", tmp_path / "approve-state.json")
+    store = mocker.patch("openqabot.approver.FingerprintStore")
+    amqp = AMQP(args)
+    assert amqp.approval_worker.approver.fingerprints is None
+    store.assert_not_called()
+
+
 @pytest.mark.parametrize(
     ("build", "expected_type", "expected_id"),
     [
@@ -182,3 +193,82 @@ def test_fetch_openqa_results_no_id(mocker: MockerFixture, amqp: AMQP) -> None:
 
     amqp.fetch_openqa_results(cast("Data", {}), message)
     post_result_mock.assert_not_called()
+
+
+def test_handle_submission_schedules_approval(mocker: MockerFixture, amqp: AMQP) -> None:
+    mocker.patch("openqabot.amqp.get_submission_settings_data", return_value=[])
+    schedule = mocker.patch.object(amqp.approval_worker, "schedule")
+
+    amqp.handle_submission(42, DEFAULT_SUBMISSION_TYPE, {})
+    schedule.assert_called_once_with(42, DEFAULT_SUBMISSION_TYPE)
+
+
+def test_approval_worker_debounces_bursts(mocker: MockerFixture) -> None:
+    mocker.patch("openqabot.amqp.get_single_submission", side_effect=lambda nr, **_kwargs: [nr])
+    approved = threading.Semaphore(0)
+    approver = mocker.Mock(spec=Approver)
+    approver.approve_submissions.side_effect = lambda _subreqs: approved.release()
+    worker = ApprovalWorker(approver, debounce=0.2, max_delay=3600)
+    worker.start()
+    for _ in range(100):
+        worker.schedule(42, DEFAULT_SUBMISSION_TYPE)
+    worker.schedule(43, "git")
+
+    assert approved.acquire(timeout=10)
+    assert approved.acquire(timeout=10)
+    worker.close()
+    assert sorted(c.args[0] for c in approver.approve_submissions.call_args_list) == [[42], [43]]
+    assert approver.refresh.call_count == 2
+    approver.close.assert_called_once_with()
+
+
+def test_approval_worker_evaluates_settled_submissions(mocker: MockerFixture) -> None:
+    mocker.patch("openqabot.amqp.get_single_submission", side_effect=lambda nr, **_kwargs: [nr])
+    approved = threading.Event()
+    approver = mocker.Mock(spec=Approver)
+    approver.approve_submissions.side_effect = lambda _subreqs: approved.set()
+    worker = ApprovalWorker(approver, debounce=0.01, max_delay=3600)
+    worker.start()
+
+    worker.schedule(42, DEFAULT_SUBMISSION_TYPE)
+    assert approved.wait(timeout=10)
+    worker.close()
+    approver.approve_submissions.assert_called_once_with([42])
+
+
+def test_approval_worker_delay_bounded(mocker: MockerFixture) -> None:
+    mocker.patch("openqabot.amqp.get_single_submission", side_effect=lambda nr, **_kwargs: [nr])
+    approved = threading.Event()
+    approver = mocker.Mock(spec=Approver)
+    approver.approve_submissions.side_effect = lambda _subreqs: approved.set()
+    worker = ApprovalWorker(approver, debounce=3600, max_delay=0.1)
+    worker.start()
+
+    while not approved.is_set():
+        worker.schedule(42, DEFAULT_SUBMISSION_TYPE)
+        approved.wait(timeout=0.01)
+    worker.close()
+    approver.approve_submissions.assert_called_once_with([42])
+
+
+def test_approval_worker_drops_pending_on_close(caplog: pytest.LogCaptureFixture, mocker: MockerFixture) -> None:
+    caplog.set_level(logging.INFO, logger="bot.amqp")
+    approver = mocker.Mock(spec=Approver)
+    worker = ApprovalWorker(approver, debounce=3600, max_delay=3600)
+    worker.start()
+    worker.schedule(42, DEFAULT_SUBMISSION_TYPE)
+    worker.schedule(43, "git")
+
+    worker.close()
+    approver.approve_submissions.assert_not_called()
+    assert "Dropping 2 pending approval evaluations" in caplog.messages
+    assert worker.take() is None
+
+
+def test_approval_worker_failure_logged(caplog: pytest.LogCaptureFixture, mocker: MockerFixture) -> None:
+    mocker.patch("openqabot.amqp.get_single_submission", side_effect=ValueError("no submission"))
+    worker = ApprovalWorker(mocker.Mock(spec=Approver), debounce=0, max_delay=0)
+
+    worker.approve(42, DEFAULT_SUBMISSION_TYPE)
+    worker.close()
+    assert f"Approval of submission {DEFAULT_SUBMISSION_TYPE}:42 failed" in caplog.messages
@@ -5,18 +5,29 @@
 from __future__ import annotations
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
-from typing import TYPE_CHECKING, Any, NoReturn
+from typing import TYPE_CHECKING, Any, NoReturn, override
 
 import pytest
+import requests
+from openqa_client.exceptions import ConnectionError as OpenQAConnectionError
 from openqa_client.exceptions import RequestError
 
-from openqabot.approver import Approver, JobResult, OlderJobResult
+from openqabot import approver as approver_module
+from openqabot.approver import Approver, JobResult, OlderJobResult, ms2str, reduce_job_results
+from openqabot.config import settings
+from openqabot.errors import JobNotFoundError, NoResultsError
 from openqabot.loader.qem import JobAggr, SubReq
+from openqabot.openqa import OpenQAInterface
 
 from .helpers import args, make_approver_args
 
 if TYPE_CHECKING:
+    from pathlib import Path
+    from unittest.mock import MagicMock
+
     from pytest_mock import MockerFixture
 
 
@@ -293,3 +304,435 @@ def test_clone_dedup_keeps_highest_job_id(mocker: MockerFixture) -> None:
     mock_aggregates = [JobAggr(id=1, aggregate=False, with_aggregate=True)]
     result = approver.get_jobs(mock_aggregates[0], "api/jobs/update/", 1)
     assert result is JobResult.PASSED
+
+
+def test_prefetch_job_results(mocker: MockerFixture) -> None:
+    def submission_settings(sub: int, **_kwargs: Any) -> list[JobAggr]:
+        if sub == 3:
+            raise NoResultsError(sub)
+        return [JobAggr(10 + sub, aggregate=False, with_aggregate=sub != 2)]
+
+    def aggregate_settings(sub: int, **_kwargs: Any) -> list[JobAggr]:
+        if sub == 4:
+            raise requests.ConnectionError
+        return [JobAggr(20, aggregate=True)]
+
+    mocker.patch("openqabot.approver.get_submission_settings", side_effect=submission_settings)
+    get_aggregate_settings = mocker.patch("openqabot.approver.get_aggregate_settings", side_effect=aggregate_settings)
+
+    def get_job_results(route: str, **_kwargs: Any) -> list[dict[str, Any]]:
+        if route.endswith("/15"):
+            raise requests.ConnectionError
+        return []
+
+    get_json = mocker.patch("openqabot.approver.dashboard.get_json", side_effect=get_job_results)
+    subreqs = [SubReq(1, 100), SubReq(2, 200, "git"), SubReq(3, 300), SubReq(4, 400), SubReq(5, 500)]
+
+    Approver(args).prefetch_job_results(subreqs)
+
+    assert sorted(c.args[0] for c in get_aggregate_settings.call_args_list) == [1, 4, 5]
+    assert sorted((c.args[0], c.kwargs["params"]) for c in get_json.call_args_list) == [
+        ("api/jobs/incident/11", {}),
+        ("api/jobs/incident/12", {"type": "git"}),
+        ("api/jobs/incident/15", {}),
+        ("api/jobs/update/20", {}),
+    ]
+
+
+def test_get_jobs_shares_setting_results(mocker: MockerFixture) -> None:
+    get_json = mocker.patch(
+        "openqabot.approver.dashboard.get_json",
+        return_value=[
+            {"job_id": 1, "name": "a", "status": "failed"},
+            {"job_id": 2, "name": "a", "status": "passed"},
+            {"job_id": 3, "name": "b", "status": "failed"},
+        ],
+    )
+    approver = Approver(args)
+    marked = mocker.patch.object(
+        approver, "is_job_marked_acceptable_for_submission", side_effect=lambda _job_id, sub: sub == 2
+    )
+    mocker.patch.object(approver, "mark_job_as_acceptable_for_submission")
+    job_aggr = JobAggr(10, aggregate=False)
+
+    assert approver.get_jobs(job_aggr, "api/jobs/incident/", 1) is JobResult.FAILED
+    assert approver.get_jobs(job_aggr, "api/jobs/incident/", 2) is JobResult.PASSED
+    get_json.assert_called_once()
+    assert [c.args for c in marked.call_args_list] == [(3, 1), (3, 2)]
+
+
+def test_reduce_job_results() -> None:
+    jobs = [
+        {"job_id": 3, "name": "a", "status": "passed"},
+        {"job_id": 1, "name": "a", "status": "failed"},
+        {"job_id": 2, "name": "b", "status": "failed"},
+        {"name": "b", "status": "passed"},
+        {"job_id": 4, "status": "failed"},
+        {"job_id": 5, "name": None, "status": "passed"},
+        {"job_id": 6, "name": "", "status": "failed"},
+    ]
+    assert reduce_job_results(jobs) == (4, [jobs[2], jobs[4]])
+    assert reduce_job_results([]) == (0, [])
+
+
+def test_acceptable_for_comments_scanned_once(mocker: MockerFixture) -> None:
+    get_job_comments = mocker.patch(
+        "openqabot.openqa.OpenQAInterface.get_job_comments",
+        return_value=[
+            {"text": "@review:acceptable_for:incident_1:reason @review:acceptable_for:submission_22:\x00other"},
+            {"text": "@review:acceptable_for:incident_3:\nnot a reason @review:acceptable_for:incident_4:"},
+        ],
+    )
+    approver_instance = Approver(args)
+
+    assert approver_instance.acceptable_for(100) == {1, 3, 22}
+    assert approver_instance.is_job_marked_acceptable_for_submission(100, 22)
+    assert not approver_instance.is_job_marked_acceptable_for_submission(100, 2)
+    assert not approver_instance.is_job_marked_acceptable_for_submission(100, 4)
+    get_job_comments.assert_called_once_with(100)
+
+
+def test_prefetch_older_jobs(mocker: MockerFixture) -> None:
+    histories: dict[int, dict] = {
+        1: {"data": [{"id": 1, "result": "failed"}, {"id": 10, "result": "passed"}, {"id": 11, "result": "failed"}]},
+        2: {
+            "data": [{"id": 2, "result": "failed"}, {"id": 10, "result": "passed"}, {"id": 12, "result": "softfailed"}]
+        },
+    }
+    get_older_jobs = mocker.patch(
+        "openqabot.openqa.OpenQAInterface.get_older_jobs",
+        side_effect=lambda job_id, _limit: histories[job_id],
+    )
+    get_jobs_by_ids = mocker.patch(
+        "openqabot.openqa.OpenQAInterface.get_jobs_by_ids",
+        return_value=[{"id": 10, "settings": {"BASE_TEST_REPOS": "Maintenance:/5/"}}, {"id": 12, "settings": {}}],
+    )
+    get_single_job = mocker.patch("openqabot.openqa.OpenQAInterface.get_single_job")
+    get_json = mocker.patch("openqabot.approver.dashboard.get_json", return_value={"status": "passed"})
+    Approver.validate_job_qam.cache_clear()
+    approver_instance = Approver(args)
+
+    approver_instance.prefetch_older_jobs([1, 2], 5)
+    approver_instance.prefetch_older_jobs([1, 2], 5)
+    approver_instance.prefetch_older_jobs([], 5)
+
+    get_jobs_by_ids.assert_called_once()
+    assert sorted(get_jobs_by_ids.call_args.args[0]) == [10, 12]
+    assert approver_instance.older_job_history(2) is histories[2]
+    assert get_older_jobs.call_count == 2
+    assert approver_instance.job_contains_submission(10, 5)
+    assert approver_instance.validate_job_qam(10)
+    get_single_job.assert_not_called()
+    get_json.assert_called_once()
+    assert get_json.call_args.args == ("api/jobs/10",)
+
+
+def test_prefetch_older_jobs_other_submission(mocker: MockerFixture) -> None:
+    mocker.patch(
+        "openqabot.openqa.OpenQAInterface.get_older_jobs",
+        return_value={"data": [{"id": 1, "result": "failed"}, {"id": 10, "result": "passed"}]},
+    )
+    mocker.patch(
+        "openqabot.openqa.OpenQAInterface.get_jobs_by_ids",
+        return_value=[{"id": 10, "settings": {"BASE_TEST_REPOS": "Maintenance:/5/"}}],
+    )
+    get_json = mocker.patch("openqabot.approver.dashboard.get_json")
+    Approver.validate_job_qam.cache_clear()
+    approver_instance = Approver(args)
+
+    approver_instance.prefetch_older_jobs([1], 6)
+
+    get_json.assert_not_called()
+
+
+def test_prefetch_job_validation_error(mocker: MockerFixture, caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.DEBUG, logger="bot.approver")
+    mocker.patch("openqabot.approver.dashboard.get_json", side_effect=requests.ConnectionError("down"))
+    Approver.validate_job_qam.cache_clear()
+
+    Approver(args).prefetch_job_validation(10)
+
+    assert "Prefetching dashboard validation of job 10 failed: down" in caplog.messages
+
+
+def test_prefetch_older_jobs_errors(mocker: MockerFixture) -> None:
+    error = OpenQAConnectionError(requests.ConnectionError("down"))
+    mocker.patch(
+        "openqabot.openqa.OpenQAInterface.get_older_jobs",
+        side_effect=[error, {"data": [{"id": 2}, {"id": 20, "result": "passed"}]}],
+    )
+    mocker.patch("openqabot.openqa.OpenQAInterface.get_jobs_by_ids", side_effect=error)
+    approver_instance = Approver(args)
+
+    approver_instance.prefetch_older_jobs([1, 2], 5)
+
+    assert approver_instance.older_jobs == {}
+
+
+def test_job_settings_scanned_once(mocker: MockerFixture) -> None:
+    get_single_job = mocker.patch(
+        "openqabot.openqa.OpenQAInterface.get_single_job",
+        return_value={
+            "settings": {
+                "BASE_TEST_REPOS": "http://download/SUSE:/Maintenance:/12/repo/,http://download/SUSE:/Maintenance:/3/repo/",
+                "INCIDENT_REPO": "http://download/SUSE:/Maintenance:/45",
+            }
+        },
+    )
+    approver_instance = Approver(args)
+
+    assert approver_instance.job_submissions(100) == {12, 3}
+    assert approver_instance.job_contains_submission(100, 3)
+    assert not approver_instance.job_contains_submission(100, 2)
+    assert not approver_instance.job_contains_submission(100, 45)
+    get_single_job.assert_called_once_with(100)
+
+
+def test_get_submission_result_cancels_on_failure(mocker: MockerFixture) -> None:
+    jobs = [JobAggr(id=i, aggregate=False, with_aggregate=False) for i in range(3)]
+    shutting_down = threading.Event()
+
+    class Executor(ThreadPoolExecutor):
+        @override
+        def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+            shutting_down.set()
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def get_jobs(job_aggr: JobAggr, *_args: Any, **_kwargs: Any) -> JobResult:
+        if job_aggr.id == 0:
+            return JobResult.FAILED
+        shutting_down.wait(timeout=10)
+        return JobResult.PASSED
+
+    mocker.patch("openqabot.approver.ThreadPoolExecutor", Executor)
+    mocker.patch.object(settings, "max_workers", 1)
+    mock_get_jobs = mocker.patch.object(Approver, "get_jobs", side_effect=get_jobs)
+
+    approver_instance = Approver(args)
+    approver_instance.concurrent_settings = True
+
+    assert approver_instance.get_submission_result(jobs, "api/jobs/incident/", 1) is JobResult.FAILED
+    assert jobs[2] not in [c.args[0] for c in mock_get_jobs.call_args_list]
+
+
+def test_get_submission_result_sequential_stops_on_failure(mocker: MockerFixture) -> None:
+    jobs = [JobAggr(id=i, aggregate=False, with_aggregate=False) for i in range(3)]
+    get_jobs = mocker.patch.object(Approver, "get_jobs", side_effect=[JobResult.PASSED, JobResult.FAILED])
+    executor = mocker.spy(approver_module, "ThreadPoolExecutor")
+    approver_instance = Approver(args)
+
+    assert approver_instance.get_submission_result(jobs, "api/jobs/incident/", 1) is JobResult.FAILED
+    assert get_jobs.call_count == 2
+    # only the shared lookup executor of the approver
+    executor.assert_called_once()
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_get_submission_result_summary(mocker: MockerFixture, *, concurrent: bool) -> None:
+    jobs = [JobAggr(id=i, aggregate=False, with_aggregate=False) for i in range(3)]
+    mocker.patch.object(Approver, "get_jobs", side_effect=[JobResult.NO_JOBS, JobResult.PASSED, JobResult.NO_JOBS])
+    approver_instance = Approver(args)
+    approver_instance.concurrent_settings = concurrent
+
+    assert approver_instance.get_submission_result(jobs, "api/jobs/incident/", 1) is JobResult.PASSED
+    mocker.patch.object(Approver, "get_jobs", return_value=JobResult.NO_JOBS)
+    assert approver_instance.get_submission_result(jobs, "api/jobs/incident/", 1) is JobResult.NO_JOBS
+
+
+@pytest.mark.parametrize(("count", "concurrent"), [(1, True), (2, False)])
+def test_job_settings_concurrent_for_single_submission(mocker: MockerFixture, count: int, *, concurrent: bool) -> None:
+    mocker.patch.object(Approver, "prefetch_job_results")
+    approver_instance = Approver(make_approver_args(dry=True))
+    mocker.patch.object(Approver, "approvable", return_value=False)
+
+    assert approver_instance.approve_submissions([SubReq(i, 100) for i in range(count)]) == 0
+    assert approver_instance.concurrent_settings is concurrent
+
+
+def test_refresh_forgets_job_results(mocker: MockerFixture) -> None:
+    get_json = mocker.patch("openqabot.approver.dashboard.get_json", return_value={"status": "passed"})
+    get_single_job = mocker.patch(
+        "openqabot.openqa.OpenQAInterface.get_single_job", return_value={"settings": "Maintenance:/5/"}
+    )
+    Approver.validate_job_qam.cache_clear()
+    approver_instance = Approver(args)
+    assert approver_instance.validate_job_qam(10)
+    assert approver_instance.job_contains_submission(10, 5)
+
+    approver_instance.older_jobs[11] = {"settings": {}}
+    approver_instance.older_histories[1] = {"data": []}
+
+    approver_instance.refresh()
+
+    assert approver_instance.older_jobs == {}
+    assert approver_instance.older_histories == {}
+    assert approver_instance.validate_job_qam(10)
+    assert approver_instance.job_contains_submission(10, 5)
+    assert get_json.call_count == 2
+    get_single_job.assert_called_once_with(10)
+
+
+def test_unchanged_submissions_skipped(tmp_path: Path, caplog: pytest.LogCaptureFixture, mocker: MockerFixture) -> None:
+    caplog.set_level(logging.INFO, logger="bot.approver")
+    mocker.patch.object(settings, "approve_state_file", tmp_path / "approve.json")
+    mocker.patch("openqabot.approver.osc.conf.get_config")
+    sub = SubReq(1, 100)
+    results = {1: [{"job_id": 10, "name": "a", "status": "failed"}], 2: [{"job_id": 20, "status": "failed"}]}
+    mocker.patch.object(
+        Approver,
+        "job_settings",
+        return_value=(
+            [JobAggr(1, aggregate=False, with_aggregate=True)],
+            [JobAggr(2, aggregate=True, with_aggregate=False)],
+        ),
+    )
+    mocker.patch.object(
+        Approver, "fetch_job_results", side_effect=lambda _api, settings_id, _type: results[settings_id]
+    )
+    mocker.patch.object(OpenQAInterface, "get_job_comments", return_value=[])
+    evaluate = mocker.patch.object(Approver, "evaluate", return_value=False)
+
+    assert Approver(make_approver_args()).approve_submissions([sub]) == 0
+    assert Approver(make_approver_args()).approve_submissions([sub]) == 0
+    evaluate.assert_called_once_with(sub)
+    assert f"Approval check for {ms2str(sub)} skipped: Job results unchanged since last check" in caplog.messages
+
+    # the aggregate tests are not evaluated as long as the submission tests fail
+    results[2] = [{"job_id": 21, "status": "failed"}]
+    assert not Approver(make_approver_args()).approvable(sub)
+    assert evaluate.call_count == 1
+
+    results[1].append({"job_id": 11, "name": "a", "status": "failed"})
+    assert not Approver(make_approver_args()).approvable(sub)
+    assert evaluate.call_count == 2
+
+
+def test_fingerprint_ignores_marks_of_other_submissions(mocker: MockerFixture) -> None:
+    mocker.patch.object(
+        Approver, "job_settings", return_value=([JobAggr(1, aggregate=False, with_aggregate=False)], [])
+    )
+    mocker.patch.object(Approver, "fetch_job_results", return_value=[{"job_id": 10, "name": "a", "status": "failed"}])
+    mocker.patch.object(
+        OpenQAInterface, "get_job_comments", return_value=[{"text": "@review:acceptable_for:incident_2:other"}]
+    )
+    mocker.patch("openqabot.approver.dashboard.patch")
+    approver_instance = Approver(make_approver_args())
+
+    digest = approver_instance.result_fingerprint(SubReq(1, 100))
+    assert digest is not None
+    not_ok_jobs = approver_instance.get_setting_jobs("api/jobs/incident/", 1, None) or []
+    approver_instance.mark_jobs_as_acceptable_for_submission(not_ok_jobs, 2)
+    assert not_ok_jobs[0]["acceptable_for_2"]
+    not_ok_jobs[0]["obsolete"] = True
+    assert approver_instance.result_fingerprint(SubReq(1, 100)) == digest
+
+
+def test_fingerprint_needs_job_settings(mocker: MockerFixture) -> None:
+    mocker.patch("openqabot.approver.get_submission_settings", side_effect=requests.ConnectionError("down"))
+
+    assert Approver(make_approver_args()).result_fingerprint(SubReq(1, 100)) is None
+
+
+def make_failed_submission(mocker: MockerFixture, tmp_path: Path, *, aggregate: bool = False) -> MagicMock:
+    mocker.patch.object(settings, "approve_state_file", tmp_path / "approve.json")
+    s_jobs = [JobAggr(1, aggregate=False, with_aggregate=aggregate)]
+    a_jobs = [JobAggr(2, aggregate=True, with_aggregate=False)] if aggregate else []
+    mocker.patch.object(Approver, "job_settings", return_value=(s_jobs, a_jobs))
+    failed_setting = 2 if aggregate else 1
+    mocker.patch.object(
+        Approver,
+        "fetch_job_results",
+        side_effect=lambda _api, settings_id, _type: [
+            {"job_id": 10, "status": "failed"} if settings_id == failed_setting else {"job_id": 11, "status": "passed"}
+        ],
+    )
+    return mocker.patch.object(Approver, "evaluate", return_value=False)
+
+
+def test_submissions_marked_acceptable_reevaluated(tmp_path: Path, mocker: MockerFixture) -> None:
+    evaluate = make_failed_submission(mocker, tmp_path)
+    comments = mocker.patch.object(OpenQAInterface, "get_job_comments", return_value=[{"text": "broken"}])
+
+    approver_instance = Approver(make_approver_args())
+    assert not approver_instance.approvable(SubReq(1, 100))
+    approver_instance.refresh()
+    assert not approver_instance.approvable(SubReq(1, 100))
+    assert evaluate.call_count == 1
+
+    comments.return_value = [{"text": "@review:acceptable_for:incident_1:known issue"}]
+    approver_instance.refresh()
+    evaluate.return_value = True
+    assert approver_instance.approvable(SubReq(1, 100))
+    assert evaluate.call_count == 2
+
+
+def test_submissions_with_gone_jobs_reevaluated(tmp_path: Path, mocker: MockerFixture) -> None:
+    evaluate = make_failed_submission(mocker, tmp_path)
+    comments = mocker.patch.object(OpenQAInterface, "get_job_comments", return_value=[])
+
+    approver_instance = Approver(make_approver_args())
+    assert not approver_instance.approvable(SubReq(1, 100))
+    comments.side_effect = JobNotFoundError(10)
+    approver_instance.refresh()
+    assert not approver_instance.approvable(SubReq(1, 100))
+    approver_instance.refresh()
+    assert not approver_instance.approvable(SubReq(1, 100))
+    assert evaluate.call_count == 2
+
+
+def test_submissions_waiting_on_older_jobs_skipped(tmp_path: Path, mocker: MockerFixture) -> None:
+    evaluate = make_failed_submission(mocker, tmp_path, aggregate=True)
+    mocker.patch.object(OpenQAInterface, "get_job_comments", return_value=[])
+    older_job_history = mocker.patch.object(Approver, "older_job_history", return_value={"data": []})
+    approver_instance = Approver(make_approver_args())
+    evaluate.side_effect = lambda sub: approver_instance.was_ok_before(10, sub.sub)
+
+    # the older jobs could not be looked up
+    assert not approver_instance.approvable(SubReq(1, 100))
+    approver_instance.refresh()
+    assert not approver_instance.approvable(SubReq(1, 100))
+    assert evaluate.call_count == 2
+
+    older_job_history.return_value = {"data": [{"id": 10, "build": "20240101-1", "result": "failed"}]}
+    approver_instance.refresh()
+    assert not approver_instance.approvable(SubReq(1, 100))
+    approver_instance.refresh()
+    assert not approver_instance.approvable(SubReq(1, 100))
+    assert evaluate.call_count == 3
+    assert older_job_history.call_count == 3
+
+
+def test_approvable_submissions_not_recorded(tmp_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "approve_state_file", tmp_path / "approve.json")
+    mocker.patch.object(
+        Approver, "job_settings", return_value=([JobAggr(1, aggregate=False, with_aggregate=False)], [])
+    )
+    fetch_job_results = mocker.patch.object(Approver, "fetch_job_results", return_value=[])
+    evaluate = mocker.patch.object(Approver, "evaluate", return_value=True)
+    approver_instance = Approver(make_approver_args())
+
+    assert approver_instance.approvable(SubReq(1, 100))
+    assert approver_instance.approvable(SubReq(1, 100))
+    fetch_job_results.side_effect = requests.ConnectionError("down")
+    evaluate.return_value = False
+    approver_instance.refresh()
+    assert not approver_instance.approvable(SubReq(1, 100))
+    approver_instance.refresh()
+    assert not approver_instance.approvable(SubReq(1, 100))
+    assert evaluate.call_count == 4
+
+
+def test_single_submission_not_skipped(tmp_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "approve_state_file", tmp_path / "approve.json")
+
+    assert Approver(make_approver_args(submission=1)).fingerprints is None
+    assert Approver(make_approver_args()).fingerprints is not None
+
+
+def test_lookups_stopped_after_run(mocker: MockerFixture) -> None:
+    mocker.patch("openqabot.approver.get_submissions_approver", return_value=[])
+    approver_instance = Approver(make_approver_args())
+
+    assert approver_instance() == 0
+    with pytest.raises(RuntimeError, match="shutdown"):
+        approver_instance.lookups.submit(print)
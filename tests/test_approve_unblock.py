@@ -62,19 +62,21 @@ def fake_responses_for_unblocking_submissions_via_older_ok_result(
             ],
         },
     )
+    job_settings = {
+        "BASE_TEST_REPOS": (
+            f"{settings.obs_download_url}/SUSE:/Maintenance:/1111/SUSE_Updates_SLE-Module-Basesystem_15-SP5_x86_64/,"
+            f"{settings.obs_download_url}/SUSE:/Maintenance:/{request.param}/SUSE_Updates_SLE-Module-Basesystem_15-SP5_x86_64/"
+        )
+    }
     responses.add(
         responses.GET,
-        re.compile(r"http://instance.qa/api/v1/jobs/.*"),
-        json={
-            "job": {
-                "settings": {
-                    "BASE_TEST_REPOS": (
-                        f"{settings.obs_download_url}/SUSE:/Maintenance:/1111/SUSE_Updates_SLE-Module-Basesystem_15-SP5_x86_64/,"
-                        f"{settings.obs_download_url}/SUSE:/Maintenance:/{request.param}/SUSE_Updates_SLE-Module-Basesystem_15-SP5_x86_64/"
-                    )
-                },
-            },
-        },
+        re.compile(r"http://instance.qa/api/v1/jobs\?ids=.*"),
+        json={"jobs": [{"id": 100005, "settings": job_settings}]},
+    )
+    responses.add(
+        responses.GET,
+        re.compile(r"http://instance.qa/api/v1/jobs/\d+$"),
+        json={"job": {"settings": job_settings}},
     )
 
 
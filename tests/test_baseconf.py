@@ -11,6 +11,8 @@ import pytest
 from openqabot.types.baseconf import BaseConf, JobConfig
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from openqabot.types.submission import Submission
 
 
@@ -23,10 +25,10 @@ class FakeBaseConf(BaseConf):
         ci_url: str | None,
         *,
         ignore_onetime: bool,
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """Mock __call__."""
         _ = (submissions, ci_url, ignore_onetime)
-        return [{"foo": "bar"}]
+        return iter([{"foo": "bar"}])
 
     @staticmethod
     def normalize_repos(config: dict[str, Any]) -> dict[str, Any]:
@@ -47,8 +49,10 @@ def baseconf_gen() -> FakeBaseConf:
 def test_baseconf_init(baseconf_gen: FakeBaseConf) -> None:
     assert baseconf_gen.product == prod_name
     assert baseconf_gen.settings == settings
-    assert baseconf_gen([], None, ignore_onetime=False), "can be called"
+    assert list(baseconf_gen([], None, ignore_onetime=False)), "can be called"
     assert not baseconf_gen.normalize_repos({}), "static method can be called"
+    assert baseconf_gen.settings_sources() == [settings]
+    assert baseconf_gen.priority() == 50
 
 
 def test_is_embargoed(baseconf_gen: FakeBaseConf) -> None:
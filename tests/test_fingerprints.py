@@ -0,0 +1,73 @@
+# Copyright SUSE LLC
+# SPDX-License-Identifier: MIT
+"""Test fingerprints."""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import TYPE_CHECKING
+
+from openqabot.fingerprints import FingerprintStore, fingerprint
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+    from pytest_mock import MockerFixture
+
+
+def test_fingerprint() -> None:
+    assert fingerprint({"b": 1, "a": [1, 2]}) == fingerprint({"a": [1, 2], "b": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_store_roundtrip(tmp_path: Path) -> None:
+    path = tmp_path / "state.json"
+    store = FingerprintStore(path, 60)
+    store.load()
+    assert not store.is_unchanged("smelt:1:worker", "abc")
+    store.record("smelt:1:worker", "abc")
+    store.save()
+    assert not (tmp_path / "state.json.tmp").exists()
+
+    loaded = FingerprintStore(path, 60)
+    loaded.load()
+    assert loaded.is_unchanged("smelt:1:worker", "abc")
+    assert not loaded.is_unchanged("smelt:1:worker", "def")
+    assert loaded.recorded("smelt:1:worker") == "abc"
+    assert loaded.recorded("smelt:2:worker") is None
+
+
+def test_store_deferred(tmp_path: Path) -> None:
+    path = tmp_path / "state.json"
+    store = FingerprintStore(path, 60)
+    store.record("smelt:1:worker", "abc")
+    store.defer("worker")
+    store.save()
+
+    loaded = FingerprintStore(path, 60)
+    loaded.load()
+    assert loaded.take_deferred() == {"worker"}
+    assert loaded.take_deferred() == set()
+    assert loaded.is_unchanged("smelt:1:worker", "abc")
+
+
+def test_store_drops_expired_entries(tmp_path: Path, mocker: MockerFixture) -> None:
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"old": {"fingerprint": "a", "time": 100}, "new": {"fingerprint": "b", "time": 950}}))
+    mocker.patch("openqabot.fingerprints.time", return_value=1000)
+    store = FingerprintStore(path, 60)
+    store.load()
+    assert not store.is_unchanged("old", "a")
+    assert store.is_unchanged("new", "b")
+
+
+def test_store_ignores_invalid_file(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.WARNING)
+    path = tmp_path / "state.json"
+    path.write_text("{invalid")
+    store = FingerprintStore(path, 60)
+    store.load()
+    assert not store.is_unchanged("smelt:1:worker", "abc")
+    assert any(m.startswith(f"Fingerprint state {path} ignored") for m in caplog.messages)
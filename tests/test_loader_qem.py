@@ -82,6 +82,7 @@ def test_get_submissions_simple(mock_get_json: MagicMock) -> None:
 
 def test_get_submissions_on_submission_returns_single_submission(mocker: MockerFixture) -> None:
     get_sub_mock = mocker.patch("openqabot.loader.qem._get_submission")
+    mocker.patch("openqabot.loader.qem.Submission.create")
     get_submissions("git:42")
     get_sub_mock.assert_called_once_with(42, "git")
 
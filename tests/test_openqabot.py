@@ -6,6 +6,7 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 from argparse import Namespace
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, NoReturn
@@ -20,11 +21,17 @@ from openqabot.args import app
 from openqabot.args import main as args_main
 from openqabot.config import settings
 from openqabot.errors import PostOpenQAError
+from openqabot.fingerprints import FingerprintStore
 from openqabot.main import errorcnt, main
 from openqabot.openqa import OpenQAInterface
-from openqabot.openqabot import OpenQABot
+from openqabot.openqabot import OpenQABot, PostQueue
+from openqabot.types.aggregate import Aggregate
+from openqabot.types.baseconf import JobConfig
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from unittest.mock import Mock
+
     from pytest_mock import MockerFixture
 
 runner = CliRunner()
@@ -171,7 +178,11 @@ def mock_runtime(mocker: MockerFixture) -> None:
             pass
 
         def __call__(self, *_args: Any, **_kwargs: Any) -> list[dict[str, Any]]:
-            return [{"qem": {"fake": "result"}, "openqa": {"fake", "result"}, "api": "bar"}]
+            return [{"qem": {"fake": "result"}, "openqa": {"fake": "result"}, "api": "bar"}]
+
+        @staticmethod
+        def settings_sources() -> list[dict[str, Any]]:
+            return [{}]
 
     def f_load_metadata(*_args: Any, **_kwds: Any) -> list[FakeWorker]:
         return [FakeWorker()]
@@ -199,7 +210,7 @@ def test_passed(mocked_openqa_bot: Namespace, caplog: pytest.LogCaptureFixture)
 
     assert len(caplog.messages) == 7
     assert "Loaded 1 submissions from QEM Dashboard" in caplog.messages
-    assert "Triggering 1 products in openQA" in caplog.messages
+    assert "Triggered 1 products in openQA" in caplog.messages
 
 
 @responses.activate
@@ -212,7 +223,7 @@ def test_passed_non_osd(mocked_openqa_bot: Namespace, caplog: pytest.LogCaptureF
 
     assert len(caplog.messages) == 7
     assert "Loaded 1 submissions from QEM Dashboard" in caplog.messages
-    assert "Triggering 1 products in openQA" in caplog.messages
+    assert "Triggered 1 products in openQA" in caplog.messages
     assert "Skipping dashboard update: No valid openQA configuration found for data" in caplog.text
 
 
@@ -226,7 +237,7 @@ def test_passed_post_osd_failed(mocked_openqa_bot: Namespace, caplog: pytest.Log
 
     assert len(caplog.messages) == 7
     assert "Loaded 1 submissions from QEM Dashboard" in caplog.messages
-    assert "Triggering 1 products in openQA" in caplog.messages
+    assert "Triggered 1 products in openQA" in caplog.messages
     assert "Skipping dashboard update: Job post failed" in caplog.messages
 
 
@@ -345,3 +356,355 @@ def test_handle_exception_debug_log_is_self_contained(mocker: MockerFixture) ->
 
     debug_calls = [str(c) for c in mock_log.debug.call_args_list]
     assert any("KeyError" in c and "'number'" in c for c in debug_calls), debug_calls
+
+
+@pytest.mark.usefixtures("mock_runtime", "mock_openqa_passed")
+def test_workers_evaluated_in_parallel(mocked_openqa_bot: Namespace, mocker: MockerFixture) -> None:
+    bot = OpenQABot(mocked_openqa_bot)
+    second_started = threading.Event()
+
+    def first(*_args: Any, **_kwargs: Any) -> Iterator[dict[str, Any]]:
+        # only completes if the second worker runs concurrently
+        assert second_started.wait(timeout=10)
+        yield {"openqa": {"worker": 1}}
+
+    def second(*_args: Any, **_kwargs: Any) -> Iterator[dict[str, Any]]:
+        second_started.set()
+        yield {"openqa": {"worker": 2}}
+        yield {"openqa": {"worker": 3}}
+
+    bot.workers = [mocker.Mock(side_effect=first), mocker.Mock(side_effect=second)]
+    mocker.patch.object(settings, "max_workers", 2)
+    queue = PostQueue(10)
+
+    assert bot.queue_posts(queue) == 3
+    queue.close()
+    posts = [job["openqa"]["worker"] for job in iter(queue.get, None)]
+    assert sorted(posts) == [1, 2, 3]
+    assert posts.index(2) < posts.index(3), "posts of a worker keep their order"
+
+
+@pytest.mark.usefixtures("mock_runtime", "mock_openqa_passed")
+def test_posts_streamed_while_workers_compute(mocked_openqa_bot: Namespace, mocker: MockerFixture) -> None:
+    bot = OpenQABot(mocked_openqa_bot)
+    bot.dry = True
+    first_posted = threading.Event()
+
+    def second(*_args: Any, **_kwargs: Any) -> list[dict[str, Any]]:
+        # only completes if the post of the first worker was sent in the meantime
+        assert first_posted.wait(timeout=10)
+        return [{"qem": {}, "openqa": {"worker": 2}, "api": "bar"}]
+
+    bot.workers = [
+        mocker.Mock(return_value=[{"qem": {}, "openqa": {"worker": 1}, "api": "bar"}]),
+        mocker.Mock(side_effect=second),
+    ]
+    post_openqa = mocker.patch.object(bot, "post_openqa", side_effect=lambda _data: first_posted.set())
+    mocker.patch.object(settings, "max_workers", 2)
+    mocker.patch.object(settings, "post_queue_size", 1)
+
+    assert bot() == 0
+    assert [c.args[0] for c in post_openqa.call_args_list] == [{"worker": 1}, {"worker": 2}]
+
+
+@pytest.mark.usefixtures("mock_runtime")
+def test_post_failures_keep_posting_threads_alive(
+    mocked_openqa_bot: Namespace, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    bot = OpenQABot(mocked_openqa_bot)
+    bot.workers = [mocker.Mock(return_value=[{"qem": {}, "openqa": {"id": i}, "api": "bar"} for i in range(6)])]
+    post_openqa = mocker.patch.object(bot, "post_openqa", side_effect=KeyError("scheduled_product_id"))
+    mocker.patch.object(settings, "max_workers", 2)
+    mocker.patch.object(settings, "post_queue_size", 2)
+
+    assert bot() == 0
+    assert post_openqa.call_count == 6
+    assert "Posting job failed: {'id': 5}" in caplog.messages
+
+
+def test_post_queue_most_urgent_first() -> None:
+    queue = PostQueue(10)
+    for name, prio in [("routine", 60), ("aggregate", None), ("emu", 30), ("routine2", 60)]:
+        queue.put({"openqa": {"name": name} | ({"_PRIORITY": prio} if prio is not None else {})})
+    queue.close()
+
+    names = []
+    while (job := queue.get()) is not None:
+        names.append(job["openqa"]["name"])
+    assert names == ["emu", "aggregate", "routine", "routine2"]
+
+
+def test_post_queue_urgent_only() -> None:
+    queue = PostQueue(10)
+    queue.put({"openqa": {"name": "routine", "_PRIORITY": 60}})
+    queue.put({"openqa": {"name": "emu", "_PRIORITY": 30}})
+    queue.close()
+
+    job = queue.get(urgent_only=True)
+    assert job is not None
+    assert job["openqa"]["name"] == "emu"
+    assert queue.get(urgent_only=True) is None
+    job = queue.get()
+    assert job is not None
+    assert job["openqa"]["name"] == "routine"
+
+
+@pytest.mark.usefixtures("mock_runtime")
+def test_urgent_posts_sent_first(mocked_openqa_bot: Namespace, mocker: MockerFixture) -> None:
+    bot = OpenQABot(mocked_openqa_bot)
+    bot.dry = True
+    posts = [{"qem": {}, "openqa": {"name": f"routine{i}", "_PRIORITY": 60}, "api": "bar"} for i in range(3)]
+    posts.append({"qem": {}, "openqa": {"name": "emu", "_PRIORITY": 30}, "api": "bar"})
+    bot.workers = [mocker.Mock(return_value=posts)]
+    post_openqa = mocker.patch.object(bot, "post_openqa", return_value=None)
+    mocker.patch.object(settings, "max_workers", 1)
+    mocker.patch.object(settings, "urgent_post_workers", 1)
+    # posting threads only start taking posts once all of them are queued
+    queue_put = PostQueue.put
+    all_queued = threading.Event()
+
+    def put(queue: PostQueue, job: dict[str, Any]) -> None:
+        queue_put(queue, job)
+        if job is posts[-1]:
+            all_queued.set()
+
+    def get(queue: PostQueue, *, urgent_only: bool = False) -> dict[str, Any] | None:
+        all_queued.wait(timeout=10)
+        return queue_get(queue, urgent_only=urgent_only)
+
+    queue_get = PostQueue.get
+    mocker.patch.object(PostQueue, "put", put)
+    mocker.patch.object(PostQueue, "get", get)
+
+    assert bot() == 0
+    names = [c.args[0]["name"] for c in post_openqa.call_args_list]
+    assert names[0] == "emu"
+    assert sorted(names[1:]) == ["routine0", "routine1", "routine2"]
+
+
+@responses.activate
+@pytest.mark.usefixtures("mock_runtime")
+def test_dashboard_update_failure_logged(
+    mocked_openqa_bot: Namespace, caplog: pytest.LogCaptureFixture, mocker: MockerFixture
+) -> None:
+    bot = OpenQABot(mocked_openqa_bot)
+    bot.openqa = mocker.Mock(**{"post_iso.return_value": None})
+    responses.add(responses.PUT, f"{settings.qem_dashboard_url}bar", body=responses.ConnectionError("down"))
+    assert bot() == 0
+    assert "Dashboard update failed for bar" in caplog.messages
+    assert "Triggered 1 products in openQA" in caplog.messages
+
+
+@pytest.mark.usefixtures("mock_runtime")
+def test_async_scheduled_products_update_dashboard(
+    mocked_openqa_bot: Namespace, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    caplog.set_level(logging.DEBUG)
+    bot = OpenQABot(mocked_openqa_bot)
+    bot.workers = [mocker.Mock(return_value=[{"qem": {}, "openqa": {"id": i}, "api": f"api{i}"} for i in range(1, 6)])]
+    mocker.patch.object(settings, "async_schedule", new=True)
+    post_iso = mocker.patch.object(bot.openqa, "post_iso", side_effect=lambda data, **_kw: data["id"] % 5 or None)
+    get_products = mocker.patch.object(
+        bot.openqa,
+        "get_scheduled_products",
+        side_effect=[
+            {1: {"status": "scheduled", "results": {}}, 2: {"status": "scheduling"}, 3: {"status": "cancelled"}},
+            {2: {"status": "scheduled", "results": {"error": "no templates"}}, 4: {"status": "scheduled"}},
+        ],
+    )
+    sleep = mocker.patch("openqabot.openqabot.sleep")
+    update_dashboard = mocker.patch.object(bot, "update_dashboard")
+
+    assert bot() == 0
+    assert all(c.kwargs == {"scheduled_async": True} for c in post_iso.call_args_list)
+    assert sorted(get_products.call_args_list[0].args[0]) == [1, 2, 3, 4]
+    assert sorted(get_products.call_args_list[1].args[0]) == [2, 4]
+    sleep.assert_called_once_with(settings.async_schedule_poll_interval)
+    assert sorted(c.args[0]["api"] for c in update_dashboard.call_args_list) == ["api1", "api4", "api5"]
+    assert "Skipping dashboard update: Scheduling of product 3 failed: {'status': 'cancelled'}" in caplog.messages
+    assert not bot.scheduled
+
+
+def test_async_scheduled_products_timeout(
+    mocked_openqa_bot: Namespace, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    mocker.patch("openqabot.openqabot.load_metadata", return_value=[])
+    bot = OpenQABot(mocked_openqa_bot)
+    bot.scheduled = {7: [{"qem": {}, "openqa": {}, "api": "bar"}]}
+    mocker.patch.object(settings, "async_schedule_timeout", 0)
+    mocker.patch.object(bot.openqa, "get_scheduled_products", return_value={7: {"status": "added"}})
+    update_dashboard = mocker.patch.object(bot, "update_dashboard")
+
+    bot.await_scheduled()
+    update_dashboard.assert_not_called()
+    assert "Skipping dashboard update: Products 7 not scheduled within 0.0s" in caplog.messages
+
+
+@pytest.mark.parametrize(("dry", "saved"), [(False, True), (True, False)])
+def test_fingerprints_loaded_and_saved(
+    mocked_openqa_bot: Namespace, mocker: MockerFixture, tmp_path: Path, *, dry: bool, saved: bool
+) -> None:
+    worker = mocker.Mock(return_value=[], **{"settings_sources.return_value": []})
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    mocker.patch("openqabot.openqabot.load_metadata", return_value=[worker])
+    mocker.patch.object(settings, "state_file", tmp_path / "state.json")
+    mocked_openqa_bot.dry = dry
+    bot = OpenQABot(mocked_openqa_bot)
+    assert bot.fingerprints is not None
+    assert worker.fingerprints is bot.fingerprints
+
+    assert bot() == 0
+    assert (tmp_path / "state.json").exists() == saved
+
+
+def test_time_budget_defers_workers(mocked_openqa_bot: Namespace, mocker: MockerFixture, tmp_path: Path) -> None:
+    def worker(prio: int) -> Mock:
+        return mocker.Mock(
+            return_value=[],
+            fingerprint=f"prio{prio}",
+            **{"priority.return_value": prio, "settings_sources.return_value": []},
+        )
+
+    routine, urgent, deferred = worker(60), worker(40), worker(70)
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    mocker.patch("openqabot.openqabot.load_metadata", return_value=[routine, urgent, deferred])
+    mocker.patch.object(settings, "state_file", tmp_path / "state.json")
+    mocker.patch.object(settings, "run_budget", 100)
+    mocker.patch.object(settings, "max_workers", 1)
+    bot = OpenQABot(mocked_openqa_bot)
+    assert bot.fingerprints is not None
+    bot.fingerprints.defer("prio70")
+    # the budget is spent after the first two workers started
+    elapsed = iter([0, 50])
+    mocker.patch("openqabot.openqabot.monotonic", side_effect=lambda: bot.started + next(elapsed, 100))
+
+    assert bot() == 0
+    deferred.assert_called_once()
+    urgent.assert_called_once()
+    routine.assert_not_called()
+    assert bot.deferred == [routine]
+    assert bot.fingerprints.take_deferred() == {"prio60"}
+
+
+def test_time_budget_ignored_without_state_file(
+    mocked_openqa_bot: Namespace, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    worker = mocker.Mock(return_value=[], **{"priority.return_value": 50, "settings_sources.return_value": []})
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    mocker.patch("openqabot.openqabot.load_metadata", return_value=[worker])
+    mocker.patch.object(settings, "run_budget", 0)
+    bot = OpenQABot(mocked_openqa_bot)
+
+    assert bot() == 0
+    worker.assert_called_once()
+    assert "Time budget of 0.0s ignored: Deferred workers can only be resumed with a state file" in caplog.messages
+
+
+def test_time_budget_resumes_deferred_workers_with_ignore_onetime(
+    mocked_openqa_bot: Namespace, mocker: MockerFixture, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    worker = mocker.Mock(fingerprint="worker", **{"priority.return_value": 50, "settings_sources.return_value": []})
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    mocker.patch("openqabot.openqabot.load_metadata", return_value=[worker])
+    mocker.patch.object(settings, "state_file", tmp_path / "state.json")
+    mocker.patch.object(settings, "run_budget", 0)
+    mocked_openqa_bot.ignore_onetime = True
+
+    assert OpenQABot(mocked_openqa_bot)() == 0
+    worker.assert_not_called()
+    assert "Time budget of 0.0s spent: Deferred 1 of 1 metadata workers to the next run" in caplog.messages
+    bot = OpenQABot(mocked_openqa_bot)
+    assert bot.fingerprints is not None
+    assert bot.fingerprints.take_deferred() == {"worker"}
+
+
+def test_without_time_budget_metadata_order_kept(mocked_openqa_bot: Namespace, mocker: MockerFixture) -> None:
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    workers = [mocker.Mock(**{"settings_sources.return_value": []}) for _ in range(2)]
+    mocker.patch("openqabot.openqabot.load_metadata", return_value=workers)
+    assert OpenQABot(mocked_openqa_bot).ordered_workers() == workers
+
+
+def test_fingerprints_unused_with_ignore_onetime(
+    mocked_openqa_bot: Namespace, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    worker = mocker.Mock(**{"settings_sources.return_value": []})
+    mocker.patch("openqabot.openqabot.load_metadata", return_value=[worker])
+    mocker.patch.object(settings, "state_file", tmp_path / "state.json")
+    mocked_openqa_bot.ignore_onetime = True
+    assert OpenQABot(mocked_openqa_bot).fingerprints is not None
+    assert not isinstance(worker.fingerprints, FingerprintStore)
+
+
+@pytest.mark.usefixtures("mock_runtime")
+@pytest.mark.parametrize(
+    ("error", "updated"), [(None, ["api1", "api2", "api3"]), (PostOpenQAError, ["api3"]), (KeyError, ["api3"])]
+)
+def test_identical_posts_sent_once(
+    mocked_openqa_bot: Namespace,
+    mocker: MockerFixture,
+    caplog: pytest.LogCaptureFixture,
+    error: type[Exception] | None,
+    updated: list[str],
+) -> None:
+    caplog.set_level(logging.INFO)
+    bot = OpenQABot(mocked_openqa_bot)
+    shared = {"FLAVOR": "Server-DVD-Updates", "ARCH": "x86_64", "_PRIORITY": 60}
+    bot.workers = [
+        mocker.Mock(return_value=[{"qem": {}, "openqa": dict(shared), "api": "api1"}]),
+        mocker.Mock(
+            return_value=[
+                {"qem": {}, "openqa": {**shared, "BUILD": "other"}, "api": "api3"},
+                {"qem": {}, "openqa": dict(reversed(shared.items())), "api": "api2"},
+            ]
+        ),
+    ]
+
+    def post_openqa(data: dict[str, Any]) -> None:
+        if error and "BUILD" not in data:
+            raise error
+
+    post = mocker.patch.object(bot, "post_openqa", side_effect=post_openqa)
+    update_dashboard = mocker.patch.object(bot, "update_dashboard")
+
+    assert bot() == 0
+    assert post.call_count == 2
+    assert sorted(c.args[0]["api"] for c in update_dashboard.call_args_list) == updated
+    assert "Skipping duplicate openQA post for Server-DVD-Updates x86_64" in caplog.messages
+
+
+@pytest.mark.usefixtures("mock_runtime")
+def test_identical_async_posts_share_scheduled_product(mocked_openqa_bot: Namespace, mocker: MockerFixture) -> None:
+    bot = OpenQABot(mocked_openqa_bot)
+    bot.workers = [mocker.Mock(return_value=[{"qem": {}, "openqa": {"A": 1}, "api": f"api{i}"} for i in (1, 2)])]
+    mocker.patch.object(bot, "post_openqa", return_value=7)
+    mocker.patch.object(bot.openqa, "get_scheduled_products", return_value={7: {"status": "scheduled"}})
+    update_dashboard = mocker.patch.object(bot, "update_dashboard")
+
+    assert bot() == 0
+    assert sorted(c.args[0]["api"] for c in update_dashboard.call_args_list) == ["api1", "api2"]
+
+
+def test_public_cloud_queries_prefetched(mocked_openqa_bot: Namespace, mocker: MockerFixture) -> None:
+    worker = mocker.Mock(**{"settings_sources.return_value": [{"PUBLIC_CLOUD_PINT_QUERY": "https://pint/"}]})
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    mocker.patch("openqabot.openqabot.load_metadata", return_value=[worker])
+    prefetch = mocker.patch("openqabot.pc_helper.prefetch_queries")
+    OpenQABot(mocked_openqa_bot)
+    assert list(prefetch.call_args.args[0]) == [{"PUBLIC_CLOUD_PINT_QUERY": "https://pint/"}]
+
+
+def test_aggregate_history_prefetched(mocked_openqa_bot: Namespace, mocker: MockerFixture) -> None:
+    aggregate = Aggregate(
+        JobConfig("product", None, None, {}, {"FLAVOR": "F", "archs": ["x86_64", "s390x"], "test_issues": {}})
+    )
+    mocker.patch("openqabot.openqabot.get_submissions", return_value=[])
+    mocker.patch(
+        "openqabot.openqabot.load_metadata",
+        return_value=[aggregate, mocker.Mock(**{"settings_sources.return_value": []})],
+    )
+    prefetch = mocker.patch.object(Aggregate, "prefetch_old_jobs")
+    OpenQABot(mocked_openqa_bot)
+    assert sorted(c.args[0] for c in prefetch.call_args_list) == ["s390x", "x86_64"]
@@ -271,3 +271,66 @@ def test_enrich_stats() -> None:
     enriched = client.enrich_stats(stats, job_map)
     assert enriched["passed"]["job1"]["group"] == "G1"
     assert "group" not in enriched["failed"]["job2"]
+
+
+def test_post_iso_adapts_concurrency() -> None:
+    client = oQAI()
+    client.retries = 0
+    limiter = client.post_limiter
+    limiter.limit = 2
+    with patch("openqabot.openqa.OpenQA_Client.openqa_request"):
+        client.post_iso({"foo": "bar"})
+    assert limiter.limit == 3
+
+    text = '{"count":0,"error":"no templates found for product sle-16.0-x86_64"}'
+    with patch("openqabot.openqa.OpenQA_Client.openqa_request", side_effect=RequestError("POST", "x", 404, text)):
+        client.post_iso({"foo": "bar"})
+    assert limiter.limit == 3
+
+    with (
+        patch("openqabot.openqa.OpenQA_Client.openqa_request", side_effect=RequestError("POST", "x", 503, "busy")),
+        pytest.raises(PostOpenQAError),
+    ):
+        client.post_iso({"foo": "bar"})
+    assert limiter.limit == 1
+    assert limiter.in_flight == 0
+
+
+def test_post_iso_scheduled_async() -> None:
+    client = oQAI()
+    with patch(
+        "openqabot.openqa.OpenQA_Client.openqa_request", return_value={"scheduled_product_id": 42}
+    ) as openqa_request:
+        assert client.post_iso({"foo": "bar"}, scheduled_async=True) == 42
+        assert openqa_request.call_args.kwargs["data"] == {"foo": "bar", "async": 1}
+        assert client.post_iso({"foo": "bar"}) is None
+        assert openqa_request.call_args.kwargs["data"] == {"foo": "bar"}
+
+
+def test_post_iso_scheduled_async_ignored(caplog: pytest.LogCaptureFixture) -> None:
+    client = oQAI()
+    with patch("openqabot.openqa.OpenQA_Client.openqa_request", return_value={"ids": [1, 2], "count": 2}):
+        assert client.post_iso({"foo": "bar"}, scheduled_async=True) is None
+    assert "openQA returned no scheduled product, assuming the jobs were created: {'ids': [1, 2], 'count': 2}" in (
+        caplog.messages
+    )
+    with (
+        patch("openqabot.openqa.OpenQA_Client.openqa_request", return_value=["unexpected"]),
+        pytest.raises(PostOpenQAError),
+    ):
+        client.post_iso({"foo": "bar"}, scheduled_async=True)
+
+
+@responses.activate
+def test_get_scheduled_products(fake_openqa_url: str, caplog: pytest.LogCaptureFixture) -> None:
+    client = oQAI()
+    client.retries = 0
+    responses.add(responses.GET, f"{fake_openqa_url}/api/v1/isos/1", json={"id": 1, "status": "scheduled"})
+    responses.add(responses.GET, f"{fake_openqa_url}/api/v1/isos/2", status=500)
+    responses.add(responses.GET, f"{fake_openqa_url}/api/v1/isos/3", json={"id": 3, "status": "scheduling"})
+
+    assert client.get_scheduled_products([1, 2, 3]) == {
+        1: {"id": 1, "status": "scheduled"},
+        3: {"id": 3, "status": "scheduling"},
+    }
+    assert "openQA API error when fetching scheduled product 2" in caplog.messages
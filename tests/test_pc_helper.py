@@ -2,18 +2,30 @@
 # SPDX-License-Identifier: MIT
 """Test PC helper."""
 
+import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 import pytest
+import requests
 import responses
 from pytest_mock import MockerFixture
 
 import openqabot.pc_helper
+from openqabot.config import settings
 from openqabot.pc_helper import (
+    PintIndex,
     apply_pc_tools_image,
     apply_publiccloud_pint_image,
+    clear_query_cache,
     get_latest_tools_image,
     get_recent_pint_image,
+    pint_index,
+    pint_query,
+    prefetch_queries,
+    query_json,
 )
 
 
@@ -197,6 +209,7 @@ def test_get_latest_tools_image() -> None:
     )
     ret = get_latest_tools_image("http://url/results")
     assert ret is None
+    clear_query_cache()
 
     responses.add(
         responses.GET,
@@ -210,3 +223,103 @@ def test_get_latest_tools_image() -> None:
     )
     ret = get_latest_tools_image("http://url/results")
     assert ret == "publiccloud_tools_test.qcow2"
+
+
+def test_query_json_ttl(mocker: MockerFixture) -> None:
+    get_mock = mocker.patch("openqabot.pc_helper.retried_requests.get")
+    clock = mocker.patch("openqabot.pc_helper.monotonic", return_value=0)
+    query_json("foo")
+    clock.return_value = settings.pc_query_ttl - 1
+    query_json("foo")
+    assert get_mock.call_count == 1
+    clock.return_value = settings.pc_query_ttl
+    query_json("foo")
+    assert get_mock.call_count == 2
+
+
+def test_query_json_failures_not_cached(mocker: MockerFixture) -> None:
+    get_mock = mocker.patch("openqabot.pc_helper.retried_requests.get", side_effect=requests.ConnectionError)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            query_json("foo")
+    assert get_mock.call_count == 2
+
+
+def test_query_json_single_fetch_for_concurrent_callers(mocker: MockerFixture) -> None:
+    fetching = threading.Event()
+    release = threading.Event()
+
+    def get(_query: str) -> Any:
+        fetching.set()
+        release.wait(timeout=10)
+        return mocker.Mock(**{"json.return_value": {"images": []}})
+
+    get_mock = mocker.patch("openqabot.pc_helper.retried_requests.get", side_effect=get)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(query_json, "foo")
+        assert fetching.wait(timeout=10)
+        second = executor.submit(query_json, "foo")
+        release.set()
+        assert first.result() == second.result() == {"images": []}
+    get_mock.assert_called_once()
+
+
+@responses.activate
+def test_prefetch_queries(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.DEBUG, logger="openqabot.pc_helper")
+    responses.add(responses.GET, "http://pint/active.json", json={"images": []})
+    responses.add(responses.GET, "http://tools/276.json", status=500)
+    prefetch_queries([
+        {"PUBLIC_CLOUD_PINT_QUERY": "http://pint/"},
+        {"PUBLIC_CLOUD_PINT_QUERY": "http://pint/", "PUBLIC_CLOUD_TOOLS_IMAGE_QUERY": "http://tools/276.json"},
+        {},
+    ])
+    assert sorted(str(c.request.url) for c in responses.calls) == ["http://pint/active.json", "http://tools/276.json"]
+    assert "Prefetching 2 Public Cloud queries" in caplog.messages
+    assert any(m.startswith("Public Cloud query prefetch failed: Query http://tools/276.json") for m in caplog.messages)
+    assert pint_query("http://pint/active.json") == {"images": []}
+    assert len(responses.calls) == 2
+
+
+def test_prefetch_queries_nothing_to_fetch(mocker: MockerFixture) -> None:
+    get_mock = mocker.patch("openqabot.pc_helper.retried_requests.get")
+    prefetch_queries([{}])
+    get_mock.assert_not_called()
+
+
+def test_pint_index_lookup() -> None:
+    images = [
+        {"name": "sles-15-sp6-v1", "state": "active", "publishedon": "20240101", "region": "north"},
+        {"name": "sles-15-sp6-v2", "state": "active", "publishedon": "20240301", "region": "south"},
+        {"name": "sles-15-sp6-v3", "state": "inactive", "publishedon": "20240501", "region": "north"},
+        {"name": "sles-16-v1", "state": "active", "publishedon": "20240601", "region": "north"},
+    ]
+    index = PintIndex(images)
+    assert index.recent("sles-15") is images[1]
+    assert index.recent("sles-15", "north") is images[0]
+    assert index.recent("sles-15", "", None) is images[2]
+    assert index.recent("sles-15", "east") is None
+    assert index.recent("sles-15", state="deprecated") is None
+    assert get_recent_pint_image(index, "sles-16", "north") is images[3]
+
+
+def test_pint_index_built_once_per_query(mocker: MockerFixture) -> None:
+    query = mocker.patch("openqabot.pc_helper.pint_query", return_value={"images": []})
+    assert pint_index("foo") is pint_index("foo")
+    query.assert_called_once_with("foo")
+
+
+@responses.activate
+def test_apply_publiccloud_pint_image_falls_back_to_inactive() -> None:
+    responses.add(responses.GET, "http://pint/active.json", json={"images": []})
+    image = {"name": "sles", "state": "inactive", "publishedon": "20240101", "region": "north", "id": "ami-1"}
+    responses.add(responses.GET, "http://pint/inactive.json", json={"images": [image]})
+    settings = {
+        "PUBLIC_CLOUD_PINT_QUERY": "http://pint/",
+        "PUBLIC_CLOUD_PINT_NAME": "sles",
+        "PUBLIC_CLOUD_PINT_FIELD": "id",
+        "PUBLIC_CLOUD_PINT_REGION": "north",
+    }
+    apply_publiccloud_pint_image(settings)
+    assert settings["PUBLIC_CLOUD_IMAGE_ID"] == "ami-1"
+    assert settings["PUBLIC_CLOUD_IMAGE_STATE"] == "inactive"
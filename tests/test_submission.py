@@ -5,14 +5,16 @@
 from __future__ import annotations
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from typing import TYPE_CHECKING, Any, NoReturn
-from unittest.mock import MagicMock
 
 import pytest
 
+from openqabot.config import settings
 from openqabot.errors import EmptyChannelsError, EmptyPackagesError, NoRepoFoundError
-from openqabot.types.submission import Submission, sort_packages
+from openqabot.types.submission import PackageMatcher, Submission, sort_packages
 from openqabot.types.types import ArchVer, Repos
 
 from .fixtures.submissions import MockSubmission
@@ -125,6 +127,18 @@ def test_sub_normal() -> None:
     assert not sub.contains_package(["foo", "bar"])
 
 
+def test_sub_shares_channels() -> None:
+    sub = Submission(test_data)
+    other_data = deepcopy(test_data)
+    other_data["number"] = 24619
+    other_data["project"] = f"SUSE:Maintenance:{sub.id}"
+    other = Submission(other_data)
+
+    assert not hasattr(sub, "__dict__")
+    assert {id(repo) for repo in sub.channels} == {id(repo) for repo in other.channels}
+    assert sub.project is other.project
+
+
 @pytest.mark.usefixtures("mock_good")
 def test_sub_normal_livepatch() -> None:
     modified_data = deepcopy(test_data)
@@ -236,6 +250,20 @@ def test_slfo_channels_and_revisions() -> None:
     assert submission.revisions == expected_revisions
 
 
+def test_slfo_channels_parsed_once(mocker: MockerFixture) -> None:
+    get_product_name = mocker.patch("openqabot.loader.gitea.get_product_name", return_value="SLES")
+    slfo_data = deepcopy(test_data)
+    slfo_data["channels"] = ["SUSE:SLFO:1.1.99:PullRequest:166:SLES:x86_64#15.99"]
+
+    first = Submission(slfo_data)
+    mocker.patch.object(settings, "obs_products", "SLES-SAP")
+    second = Submission.create(slfo_data)
+
+    get_product_name.assert_called_once_with("1.1.99:PullRequest:166:SLES")
+    assert first.channels == [Repos("SUSE:SLFO", "1.1.99:PullRequest:166:SLES", "x86_64", "15.99")]
+    assert second is None
+
+
 def test_sub_rev_multiple_repos(mocker: MockerFixture) -> None:
     data: Any = deepcopy(test_data)
     data["channels"].append("SUSE:Updates:SLE-Module-Basesystem:15-SP4:x86_64")
@@ -286,20 +314,14 @@ def test_sub_rev_non_matching_version(mocker: MockerFixture) -> None:
 
 
 def test_sub_rev_empty_channels() -> None:
-    sub = MagicMock(spec=Submission)
-    sub.id = 123
-    sub.channels = []
-    sub.rev_cache_params = None
+    sub = MockSubmission(id=123, channels=[], project="project")
     sub.rev_logged = False
-    sub.project = "project"
-    sub.compute_revisions_for_product_repo = Submission.compute_revisions_for_product_repo.__get__(sub, Submission)
-    sub.rev = Submission.rev
-    assert not sub.compute_revisions_for_product_repo(None, None)
+    assert not Submission.compute_revisions_for_product_repo(sub, None, None)
 
 
 def test_revisions_with_fallback_no_revisions(caplog: pytest.LogCaptureFixture, mocker: MockerFixture) -> None:
     sub = Submission(test_data)
-    mocker.patch.object(sub, "compute_revisions_for_product_repo")
+    mocker.patch.object(Submission, "compute_revisions_for_product_repo")
     caplog.set_level(logging.DEBUG, logger="bot.types.submission")
     assert sub.revisions_with_fallback("x86_64", "15-SP4") is None
     assert "Submission smelt:24618: No revisions available" in caplog.text
@@ -348,7 +370,7 @@ def test_compute_revisions_cache_hit(mocker: MockerFixture) -> None:
     submission.revisions = {"some": "data"}  # ty: ignore[invalid-assignment]
 
     # Should return True without calling rev
-    mock_rev = mocker.patch.object(submission, "rev")
+    mock_rev = mocker.patch.object(Submission, "rev")
     assert submission.compute_revisions_for_product_repo(None, None)
     mock_rev.assert_not_called()
 
@@ -360,7 +382,7 @@ def test_compute_revisions_cache_hit_none(mocker: MockerFixture) -> None:
     submission.compute_revisions_for_product_repo(None, None)
     submission.revisions = None
     # Should return False without calling rev
-    mock_rev = mocker.patch.object(submission, "rev")
+    mock_rev = mocker.patch.object(Submission, "rev")
     assert not submission.compute_revisions_for_product_repo(None, None)
     mock_rev.assert_not_called()
 
@@ -381,7 +403,7 @@ def test_compute_revisions_logging_once(mocker: MockerFixture, caplog: pytest.Lo
 
     sub = Submission(data)
     # Mock rev to raise NoRepoFoundError
-    mocker.patch.object(sub, "rev", side_effect=NoRepoFoundError("test error"))
+    mocker.patch.object(Submission, "rev", side_effect=NoRepoFoundError("test error"))
 
     # First call should log
     assert not sub.compute_revisions_for_product_repo(None, None)
@@ -508,3 +530,100 @@ def test_contains_package_exact_and_prefix(packages: list[str], requires: list[s
     """'=' entries match exactly; others match by prefix; kernel-livepatch-tools stays excluded."""
     sub = MockSubmission(packages=packages)
     assert Submission.contains_package(sub, requires) is expected
+
+
+@pytest.mark.parametrize(
+    ("requires", "package", "expected"),
+    [
+        pytest.param(["a", "ab"], "ac", True, id="shorter-prefix-covers-longer"),
+        pytest.param(["ab", "a"], "abc", True, id="unsorted-input"),
+        pytest.param(["kernel-default", "kernel-azure"], "kernel-b", False, id="between-prefixes"),
+        pytest.param(["kernel-default", "kernel-azure"], "kernel-default-devel", True, id="last-prefix"),
+        pytest.param(["kernel-default", "kernel-azure"], "aaa", False, id="before-all-prefixes"),
+        pytest.param([""], "anything", True, id="empty-prefix-matches-all"),
+        pytest.param([], "anything", False, id="empty-list"),
+    ],
+)
+def test_package_matcher_prefix_index(requires: list[str], package: str, *, expected: bool) -> None:
+    """A single binary search over the prefix-free index finds the matching prefix."""
+    assert PackageMatcher(requires).matches(package) is expected
+
+
+def test_package_matcher_drops_covered_prefixes() -> None:
+    matcher = PackageMatcher(["kernel-default-devel", "kernel-default", "=kernel-azure", "foo"])
+    assert matcher.prefixes == ("foo", "kernel-default")
+    assert matcher.exact == frozenset({"kernel-azure"})
+    assert repr(matcher) == "<PackageMatcher exact: ['kernel-azure'] prefixes: ['foo', 'kernel-default']>"
+
+
+def test_package_matcher_compiled_once() -> None:
+    matcher = PackageMatcher.of(["foo", "=bar"])
+    assert PackageMatcher.of(["foo", "=bar"]) is matcher
+    assert PackageMatcher.of(matcher) is matcher
+
+
+@pytest.mark.usefixtures("mock_good")
+def test_contains_package_memoized_per_submission(mocker: MockerFixture) -> None:
+    sub = Submission(test_data)
+    matcher = PackageMatcher(["some"])
+    spy = mocker.spy(PackageMatcher, "matches_any")
+    assert sub.contains_package(matcher)
+    assert sub.contains_package(matcher)
+    spy.assert_called_once()
+
+
+@pytest.mark.usefixtures("mock_good")
+def test_compute_revisions_shared_across_threads(mocker: MockerFixture) -> None:
+    """Revisions are computed once per parameters while the selection stays per thread."""
+    sub = Submission(test_data)
+    spy = mocker.spy(Submission, "rev")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(sub.compute_revisions_for_product_repo, None, None).result()
+    assert sub.rev_cache_params is None
+    assert sub.revisions is None
+    assert sub.compute_revisions_for_product_repo(None, None)
+    assert sub.revisions is not None
+    spy.assert_called_once()
+
+
+def test_compute_revisions_different_params_in_parallel(mocker: MockerFixture) -> None:
+    """Computations for different parameters do not wait for each other."""
+    sub = Submission(test_data)
+    other_done = threading.Event()
+
+    def rev(_channels: list[Repos], _project: str, options: Any, _limit_archs: set[str] | None) -> dict:
+        if options.product_name == "slow":
+            assert other_done.wait(timeout=10)
+        return {ArchVer("x86_64", "15.7"): 1}
+
+    mocker.patch.object(Submission, "rev", side_effect=rev)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        slow = executor.submit(sub.compute_revisions_for_product_repo, "slow", None)
+        assert sub.compute_revisions_for_product_repo("fast", None)
+        other_done.set()
+        assert slow.result()
+
+
+def test_compute_revisions_failure_not_cached(mocker: MockerFixture) -> None:
+    sub = Submission(test_data)
+    rev = mocker.patch.object(Submission, "rev", side_effect=[RuntimeError("down"), {ArchVer("x86_64", "15.7"): 1}])
+    with pytest.raises(RuntimeError, match="down"):
+        sub.compute_revisions_for_product_repo(None, None)
+    sub.rev_cache_params = None
+    assert sub.compute_revisions_for_product_repo(None, None)
+    assert rev.call_count == 2
+
+
+def test_submission_fingerprint() -> None:
+    sub = MockSubmission(id=1, channels=[Repos("SLES", "15.7", "x86_64")], revisions={ArchVer("x86_64", "15.7"): 1})
+    digest = sub.fingerprint()
+    assert (
+        MockSubmission(
+            id=1, channels=[Repos("SLES", "15.7", "x86_64")], revisions={ArchVer("x86_64", "15.7"): 1}
+        ).fingerprint()
+        == digest
+    )
+    sub.revisions = {ArchVer("x86_64", "15.7"): 2}
+    assert sub.fingerprint() != digest
+    sub.revisions = None
+    assert sub.fingerprint() != digest
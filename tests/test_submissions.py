@@ -5,6 +5,7 @@
 import pytest
 
 from openqabot.types.baseconf import JobConfig
+from openqabot.types.submission import PackageMatcher
 from openqabot.types.submissions import Submissions
 from openqabot.types.types import Repos
 
@@ -105,3 +106,13 @@ def test_strict_unknown_flavor_keys(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr("openqabot.config.settings.strict_metadata", True)
     with pytest.raises(ValueError, match=r"Unrecognized metadata keys .*bogus.*"):
         _make_submissions({"AAA": {"archs": ["x86_64"], "bogus": 1}})
+
+
+def test_package_lists_compiled_once_per_config() -> None:
+    subs = _make_submissions({
+        "AAA": {"archs": [], "issues": {}, "packages": ["foo"], "excluded_packages": None},
+        "BBB": {"archs": [], "issues": {}, "packages": ["foo"]},
+    })
+    assert isinstance(subs.flavors["AAA"]["packages"], PackageMatcher)
+    assert subs.flavors["AAA"]["packages"] is subs.flavors["BBB"]["packages"]
+    assert subs.flavors["AAA"]["excluded_packages"] is None
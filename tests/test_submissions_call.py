@@ -8,6 +8,8 @@ from typing import TYPE_CHECKING
 
 import pytest
 
+from openqabot.errors import DashboardError
+from openqabot.fingerprints import FingerprintStore
 from openqabot.types.baseconf import JobConfig
 from openqabot.types.submissions import Submissions
 from openqabot.types.types import ArchVer, Repos
@@ -16,6 +18,7 @@ from .fixtures.submissions import MockSubmission
 
 if TYPE_CHECKING:
     from collections.abc import Generator
+    from pathlib import Path
 
     from pytest_mock import MockerFixture
 
@@ -34,7 +37,7 @@ def test_submissions_call() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(submissions=[], ci_url="", ignore_onetime=False)
+    res = list(sub(submissions=[], ci_url="", ignore_onetime=False))
     assert res == []
 
 
@@ -51,7 +54,7 @@ def test_submissions_call_with_flavors() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(submissions=[], ci_url="", ignore_onetime=False)
+    res = list(sub(submissions=[], ci_url="", ignore_onetime=False))
     assert res == []
 
 
@@ -68,7 +71,7 @@ def test_submissions_call_with_submissions() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(submissions=[MockSubmission()], ci_url="", ignore_onetime=False)
+    res = list(sub(submissions=[MockSubmission()], ci_url="", ignore_onetime=False))
     assert res == []
 
 
@@ -85,7 +88,7 @@ def test_submissions_call_with_issues() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(submissions=[MockSubmission()], ci_url="", ignore_onetime=False)
+    res = list(sub(submissions=[MockSubmission()], ci_url="", ignore_onetime=False))
     assert res == []
 
 
@@ -115,10 +118,12 @@ def test_submissions_call_with_channels() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(
-        submissions=[MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345)],
-        ci_url="",
-        ignore_onetime=False,
+    res = list(
+        sub(
+            submissions=[MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345)],
+            ci_url="",
+            ignore_onetime=False,
+        )
     )
     assert len(res) == 1
 
@@ -138,12 +143,14 @@ def test_submissions_call_with_packages() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(
-        submissions=[
-            MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345, contains_package_value=True)
-        ],
-        ci_url="",
-        ignore_onetime=False,
+    res = list(
+        sub(
+            submissions=[
+                MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345, contains_package_value=True)
+            ],
+            ci_url="",
+            ignore_onetime=False,
+        )
     )
     assert len(res) == 1
 
@@ -188,12 +195,14 @@ def test_submissions_call_with_params_expand() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(
-        submissions=[
-            MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345, contains_package_value=True)
-        ],
-        ci_url="",
-        ignore_onetime=False,
+    res = list(
+        sub(
+            submissions=[
+                MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345, contains_package_value=True)
+            ],
+            ci_url="",
+            ignore_onetime=False,
+        )
     )
     assert len(res) == 1
     assert res[0]["openqa"]["SOMETHING"] == "flavor win"
@@ -248,12 +257,14 @@ def test_submissions_call_with_params_expand_distri_version() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(
-        submissions=[
-            MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345, contains_package_value=True)
-        ],
-        ci_url="",
-        ignore_onetime=False,
+    res = list(
+        sub(
+            submissions=[
+                MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345, contains_package_value=True)
+            ],
+            ci_url="",
+            ignore_onetime=False,
+        )
     )
     assert len(res) == 1
     assert res[0]["openqa"]["VERSION"] == "1.2.3"
@@ -303,12 +314,14 @@ def test_submissions_call_with_params_expand_isolated() -> None:
         ),
         extrasettings=set(),
     )
-    res = sub(
-        submissions=[
-            MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345, contains_package_value=True)
-        ],
-        ci_url="",
-        ignore_onetime=False,
+    res = list(
+        sub(
+            submissions=[
+                MockSubmission(channels=[Repos("", "", "")], rev_fallback_value=12345, contains_package_value=True)
+            ],
+            ci_url="",
+            ignore_onetime=False,
+        )
     )
     assert len(res) == 2
     assert res[1]["openqa"]["SOMETHING"] == "original"
@@ -351,5 +364,79 @@ def test_submissions_call_reproduction_of_repeated_schedule(mocker: MockerFixtur
         }
     ]
     mocker.patch("openqabot.types.submissions.retried_requests.get").return_value.json.return_value = mock_jobs
-    res = sub_obj(submissions=[sub], ci_url="", ignore_onetime=False)
+    res = list(sub_obj(submissions=[sub], ci_url="", ignore_onetime=False))
     assert res == []
+
+
+def _incremental_submissions(tmp_path: Path) -> Submissions:
+    sub = Submissions(
+        JobConfig(
+            product="",
+            product_repo=None,
+            product_version=None,
+            settings={"VERSION": "", "DISTRI": None},
+            config={"FLAVOR": {"AAA": {"archs": [""], "issues": {"1234": ":"}}}},
+        ),
+        extrasettings=set(),
+    )
+    sub.fingerprints = FingerprintStore(tmp_path / "state.json", 60)
+    return sub
+
+
+def test_submissions_call_skips_unchanged(tmp_path: Path, mocker: MockerFixture) -> None:
+    sub = _incremental_submissions(tmp_path)
+    submission = MockSubmission(id=1, channels=[Repos("", "", "")], rev_fallback_value=12345)
+    scheduled = mocker.patch.object(Submissions, "is_scheduled_job", return_value=False)
+
+    assert len(list(sub(submissions=[submission], ci_url="", ignore_onetime=False))) == 1
+    # posted submissions are evaluated again
+    scheduled.return_value = True
+    assert list(sub(submissions=[submission], ci_url="", ignore_onetime=False)) == []
+    assert scheduled.call_count == 2
+
+    # nothing needed to be scheduled, unchanged submissions are skipped
+    assert list(sub(submissions=[submission], ci_url="", ignore_onetime=False)) == []
+    assert scheduled.call_count == 2
+    # ignore_onetime schedules regardless of the store and the dashboard
+    assert len(list(sub(submissions=[submission], ci_url="", ignore_onetime=True))) == 1
+    assert scheduled.call_count == 2
+
+    submission.revisions = {ArchVer("", ""): 4321}
+    assert list(sub(submissions=[submission], ci_url="", ignore_onetime=False)) == []
+    assert scheduled.call_count == 3
+
+
+def test_submissions_call_never_records_transient_skips(tmp_path: Path, mocker: MockerFixture) -> None:
+    sub = _incremental_submissions(tmp_path)
+    submission = MockSubmission(id=1, channels=[Repos("", "", "")], rev_fallback_value=12345)
+    get_jobs = mocker.patch.object(Submissions, "_get_scheduled_jobs", side_effect=DashboardError)
+
+    assert list(sub(submissions=[submission], ci_url="", ignore_onetime=False)) == []
+    assert list(sub(submissions=[submission], ci_url="", ignore_onetime=False)) == []
+    assert get_jobs.call_count == 2
+
+    get_jobs.side_effect = None
+    get_jobs.return_value = []
+    mocker.patch.object(Submissions, "apply_pc_images", return_value=None)
+    assert list(sub(submissions=[submission], ci_url="", ignore_onetime=False)) == []
+    assert list(sub(submissions=[submission], ci_url="", ignore_onetime=False)) == []
+    assert get_jobs.call_count == 4
+
+
+def test_submissions_settings_sources() -> None:
+    sub = Submissions(
+        JobConfig(
+            product="",
+            product_repo=None,
+            product_version=None,
+            settings={"VERSION": ""},
+            config={
+                "FLAVOR": {
+                    "AAA": {"archs": [""], "params_expand": {"PUBLIC_CLOUD_PINT_QUERY": "https://pint/"}},
+                    "BBB": {"archs": [""]},
+                }
+            },
+        ),
+        extrasettings=set(),
+    )
+    assert sub.settings_sources() == [{"VERSION": ""}, {"PUBLIC_CLOUD_PINT_QUERY": "https://pint/"}]
@@ -581,6 +581,20 @@ def test_handle_submission_priority_logic(
     assert result["openqa"]["_PRIORITY"] == expected_prio
 
 
+@pytest.mark.parametrize(
+    ("flavors", "expected_prio"),
+    [
+        ({}, 50),
+        ({"AAA": {}}, 60),
+        ({"AAA": {}, "Minimal": {}}, 55),
+        ({"AAA": {"override_priority": 40}, "Minimal": {}}, 40),
+    ],
+)
+def test_submissions_priority(flavors: dict[str, dict[str, Any]], expected_prio: int) -> None:
+    test_config = {"FLAVOR": {flavor: {"archs": ["x86_64"], **data} for flavor, data in flavors.items()}}
+    assert _get_submissions_obj(test_config=test_config).priority() == expected_prio
+
+
 def test_handle_submission_pc_tools_image_success(mocker: MockerFixture) -> None:
     sub = MockSubmission(id=1, channels=[Repos("SLES", "15-SP3", "x86_64")], rev_fallback_value=123)
     test_config = {"FLAVOR": {"AAA": {"archs": ["x86_64"], "issues": {"OS_TEST_ISSUES": "SLES:15-SP3"}}}}
@@ -4,6 +4,8 @@
 
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -14,6 +16,7 @@ from responses import registries
 from openqabot.loader.config import get_yml_list
 from openqabot.types.types import Data
 from openqabot.utils import (
+    AdaptiveLimiter,
     compare_submission_data,
     create_logger,
     extract_contact_from_description,
@@ -212,3 +215,65 @@ def test_create_logger_duplicate_handlers() -> None:
 def test_extract_contact_from_description(description: str | None, expected: str | None) -> None:
     """Test extraction of contact information from job group descriptions."""
     assert extract_contact_from_description(description) == expected
+
+
+def test_adaptive_limiter_aimd(mocker: MockerFixture) -> None:
+    limiter = AdaptiveLimiter(4, 10)
+    for _ in range(5):
+        with limiter.slot():
+            pass
+    assert limiter.limit == 3  # only raised while at least half of the limit is used
+
+    with limiter.slot(), limiter.slot():
+        pass
+    assert limiter.limit == 4
+    with limiter.slot(), limiter.slot(), limiter.slot(), limiter.slot():
+        pass
+    assert limiter.limit == 4  # capped
+
+    clock = mocker.patch("openqabot.utils.monotonic", side_effect=[0, 11])
+    with limiter.slot():
+        pass
+    assert clock.call_count == 2
+    assert limiter.limit == 2
+    mocker.stop(clock)
+
+    limiter.limit = 1
+
+    with pytest.raises(ZeroDivisionError), limiter.slot():
+        raise ZeroDivisionError
+    assert limiter.limit == 1
+    assert limiter.in_flight == 0
+
+
+def test_adaptive_limiter_ignores_non_congestion_errors() -> None:
+    limiter = AdaptiveLimiter(4, 10, is_congestion=lambda e: not isinstance(e, KeyError))
+    limiter.limit = 2
+    with pytest.raises(KeyError), limiter.slot():
+        raise KeyError
+    assert limiter.limit == 2
+
+
+def test_adaptive_limiter_waits_for_slot() -> None:
+    limiter = AdaptiveLimiter(1, 10)
+    entered = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def first() -> None:
+        with limiter.slot():
+            entered.set()
+            release.wait(timeout=10)
+            order.append("first")
+
+    def second() -> None:
+        with limiter.slot():
+            order.append("second")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(first)
+        assert entered.wait(timeout=10)
+        executor.submit(second)
+        release.set()
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 0